@@ -0,0 +1,367 @@
+# background, cached AI advice for the "help" action
+#
+# An AdviceClient asks the API for advice as soon as a decision point appears, on a
+# background thread, so the answer is usually in by the time the player types "help".
+# Answers are cached by AdviceKey, the part of the game state the advice depends on,
+# for a limited time and a limited number of states. When the API is slow or failing,
+# get() gives up at its deadline and answers from the local basic-strategy table; a
+# late answer still lands in the cache for the next time the state comes up.
+#
+# With an AdviceStore, answers are also kept in the advice_cache table of the game's
+# database, keyed by the AdviceKey packed into one integer, so a state answered once is
+# answered without a request in every later game, by any player.
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, select, update
+
+from cards import CARD_VALUES
+from config import (
+    ADVICE_CACHE_SIZE, ADVICE_CACHE_TTL, ADVICE_REQUEST_TIMEOUT, ADVICE_STORE_TTL, ADVICE_TIMEOUT
+)
+from models import AdviceCacheEntry
+from strategy import basic_strategy
+
+# Takes a prompt and returns the API's answer.
+Fetch = Callable[[str], str]
+
+# description of every count bucket, see count_bucket
+COUNT_BUCKET_NAMES = {
+    -2: "strongly negative (-4 or lower)",
+    -1: "negative (-2 to -3)",
+    0: "neutral (-1 to +1)",
+    1: "positive (+2 to +3)",
+    2: "strongly positive (+4 or higher)",
+}
+
+
+class AdviceKey(NamedTuple):
+    """The game state advice is asked and cached for."""
+    total: int
+    soft: bool
+    upcard: int  # value of the dealer's upcard, Ace is 11
+    count_bucket: int
+
+
+class Advice(NamedTuple):
+    """An answer to "help" and where it came from: "api", "cache" or "local"."""
+    text: str
+    source: str
+
+
+def encode_advice_key(key: AdviceKey) -> int:
+    """Pack an AdviceKey into one small int, unique per state."""
+    return ((key.total * 2 + key.soft) * 12 + key.upcard) * 5 + key.count_bucket + 2
+
+
+def decode_advice_key(code: int) -> AdviceKey:
+    """Unpack an int made by encode_advice_key."""
+    rest, bucket = divmod(code, 5)
+    rest, upcard = divmod(rest, 12)
+    total, soft = divmod(rest, 2)
+    return AdviceKey(total, bool(soft), upcard, bucket - 2)
+
+
+def count_bucket(hi_lo_count: int) -> int:
+    """Group a hi-lo running count into one of the COUNT_BUCKET_NAMES buckets."""
+    return max(-2, min(2, int(hi_lo_count / 2)))
+
+
+def advice_key(player_hand, upcard_card: int, hi_lo_count: int) -> AdviceKey:
+    """
+    The AdviceKey of a Hand against the dealer's upcard code at a running count.
+
+    Only what the advice depends on is kept: suits, the order of the cards and the
+    exact count are dropped, so every hand in the same situation shares one answer.
+    """
+    return AdviceKey(player_hand.value, player_hand.is_soft, CARD_VALUES[upcard_card], count_bucket(hi_lo_count))
+
+
+def _describe(key: AdviceKey) -> Tuple[str, str]:
+    """The player's hand and the dealer's upcard in words."""
+    return f"{'soft' if key.soft else 'hard'} {key.total}", "Ace" if key.upcard == 11 else str(key.upcard)
+
+
+def advice_prompt(key: AdviceKey) -> str:
+    """The prompt sent to the API for a game state."""
+    hand, upcard = _describe(key)
+    return (
+        f"In blackjack the player has {hand} and the dealer shows {upcard}. "
+        f"The Hi-Lo count is {COUNT_BUCKET_NAMES[key.count_bucket]}. "
+        f"Basic strategy is to {basic_strategy(key.total, key.soft, key.upcard)}. "
+        f"Briefly explain why, and whether the count changes the play."
+    )
+
+
+def local_advice(key: AdviceKey) -> str:
+    """Advice from the local basic-strategy table, used when the API does not answer."""
+    hand, upcard = _describe(key)
+    return f"Basic strategy is to {basic_strategy(key.total, key.soft, key.upcard)} with {hand} against {upcard}."
+
+
+@functools.lru_cache(maxsize=None)
+def _openai_client():
+    """One OpenAI client per process; OPENAI_BASE_URL can point it at another server."""
+    # openai is slow to import and only needed here, on a request thread
+    from openai import OpenAI
+    # no retries: a failed request falls back to local advice instead
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=ADVICE_REQUEST_TIMEOUT, max_retries=0)
+
+
+def openai_completion(prompt_text: str) -> str:
+    """Ask the OpenAI completions API."""
+    response = _openai_client().completions.create(
+        model="gpt-3.5-turbo-instruct",
+        prompt=prompt_text,
+        temperature=0.1,
+        max_tokens=75,
+    )
+    return response.choices[0].text.strip()
+
+
+class AdviceStats:
+    """
+    Counters of an AdviceClient.
+
+    Attributes:
+        prefetches (int): prefetch() calls.
+        lookups (int): get() calls, i.e. times the player asked for help.
+        memory_hits (int): Lookups answered from an answer already in memory.
+        store_hits (int): Lookups answered from the AdviceStore.
+        requests (int): Requests sent to the API, for prefetches or lookups.
+        errors (int): Requests that failed.
+        fallbacks (int): Lookups answered by the local strategy.
+    """
+
+    def __init__(self):
+        self.prefetches = 0
+        self.lookups = 0
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.requests = 0
+        self.errors = 0
+        self.fallbacks = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered without a request."""
+        return (self.memory_hits + self.store_hits) / self.lookups if self.lookups else 0.0
+
+    def __repr__(self):
+        return (f"<AdviceStats(prefetches={self.prefetches}, lookups={self.lookups}, memory_hits={self.memory_hits}, "
+                f"store_hits={self.store_hits}, requests={self.requests}, errors={self.errors}, "
+                f"fallbacks={self.fallbacks}, hit_rate={self.hit_rate:.1%})>")
+
+
+class AdviceStore:
+    """
+    Answers kept in the advice_cache table, shared by every game using the database.
+
+    Attributes:
+        engine: The engine of the game's database.
+        ttl (float): Seconds an answer is used before it is fetched again.
+    """
+
+    def __init__(self, engine, ttl: float = ADVICE_STORE_TTL):
+        self.engine = engine
+        self.ttl = ttl
+
+    def load(self, key: AdviceKey) -> Optional[str]:
+        """The stored answer for key, or None if missing or expired; see count_hit."""
+        table = AdviceCacheEntry.__table__
+        with self.engine.connect() as connection:
+            row = connection.execute(
+                select(table.c.text, table.c.created).where(table.c.key == encode_advice_key(key))
+            ).first()
+        if row is None or row.created + self.ttl <= time.time():
+            return None
+        return row.text
+
+    def count_hit(self, key: AdviceKey) -> None:
+        """Count a stored answer as used; loading it alone does not, as a prefetch may go unread."""
+        table = AdviceCacheEntry.__table__
+        with self.engine.begin() as connection:
+            connection.execute(
+                update(table).where(table.c.key == encode_advice_key(key)).values(hits=table.c.hits + 1)
+            )
+
+    def save(self, key: AdviceKey, text: str) -> None:
+        """Store the answer for key, replacing an older one."""
+        code = encode_advice_key(key)
+        table = AdviceCacheEntry.__table__
+        with self.engine.begin() as connection:
+            values = {"text": text, "created": time.time(), "hits": 0}
+            if not connection.execute(update(table).where(table.c.key == code).values(**values)).rowcount:
+                connection.execute(table.insert().values(key=code, **values))
+
+    def stats(self) -> Tuple[int, int]:
+        """The number of stored answers and the hits they have had in all games."""
+        table = AdviceCacheEntry.__table__
+        with self.engine.connect() as connection:
+            entries, hits = connection.execute(
+                select(func.count(), func.coalesce(func.sum(table.c.hits), 0)).select_from(table)
+            ).one()
+        return entries, hits
+
+    def __repr__(self):
+        return f"<AdviceStore(url={self.engine.url}, ttl={self.ttl})>"
+
+
+class AdviceClient:
+    """
+    Fetches advice in the background and caches it with TTL and LRU eviction.
+
+    Call prefetch() when a decision point appears and get() when the player asks for
+    help. Only one request per state is in flight at a time. Requests run on daemon
+    threads, so a hung request never holds up the game or its exit. States missing from
+    memory are looked up in the store, if any, on the request's thread before the API is
+    called, and fetched answers are saved to it; the game thread never waits on the
+    database while holding the client's lock.
+
+    Only get() counts towards the hit rate. An answer a prefetch brought in is counted
+    by where it came from the first time get() reads it, and as a memory hit after that.
+
+    Attributes:
+        fetch (Fetch): Sends a prompt to the API and returns the answer.
+        timeout (float): Seconds get() waits for an answer before falling back.
+        ttl (float): Seconds an answer stays cached.
+        max_entries (int): States cached before the least recently used is dropped.
+        store (AdviceStore): Keeps answers across games; None to keep them in memory only.
+        stats (AdviceStats): Hit and request counters.
+    """
+
+    def __init__(
+        self,
+        fetch: Fetch = openai_completion,
+        timeout: float = ADVICE_TIMEOUT,
+        ttl: float = ADVICE_CACHE_TTL,
+        max_entries: int = ADVICE_CACHE_SIZE,
+        store: AdviceStore = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.fetch = fetch
+        self.timeout = timeout
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.store = store
+        self.stats = AdviceStats()
+        self._clock = clock
+        self._cache: "OrderedDict[AdviceKey, Tuple[float, str]]" = OrderedDict()
+        # where answers fetched for a prefetch came from, "api" or "store", until get() reads them
+        self._unread: Dict[AdviceKey, str] = {}
+        self._pending: Dict[AdviceKey, Future] = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, key: AdviceKey) -> Optional[str]:
+        """The live cached answer for key, marked as recently used; call with the lock held."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires, text = entry
+        if expires <= self._clock():
+            del self._cache[key]
+            self._unread.pop(key, None)
+            return None
+        self._cache.move_to_end(key)
+        return text
+
+    def _start(self, key: AdviceKey) -> Future:
+        """Start the request for key on a daemon thread; call with the lock held."""
+        future = self._pending[key] = Future()
+        threading.Thread(target=self._request, args=(key, future), name="advice", daemon=True).start()
+        return future
+
+    def _remember(self, key: AdviceKey, text: str, origin: str) -> None:
+        """Cache an answer in memory, evicting the least recently used; call with the lock held."""
+        self._cache[key] = (self._clock() + self.ttl, text)
+        self._cache.move_to_end(key)
+        self._unread[key] = origin
+        while len(self._cache) > self.max_entries:
+            evicted, _ = self._cache.popitem(last=False)
+            self._unread.pop(evicted, None)
+
+    def _load(self, key: AdviceKey) -> Optional[str]:
+        """The stored answer for key, or None; a failing store is treated as empty."""
+        try:
+            return self.store.load(key) if self.store else None
+        except Exception:  # the API can still answer
+            return None
+
+    def _request(self, key: AdviceKey, future: Future) -> None:
+        text = self._load(key)
+        origin = "store"
+        try:
+            if text is None:
+                origin = "api"
+                with self._lock:
+                    self.stats.requests += 1
+                text = self.fetch(advice_prompt(key))
+        except Exception as error:  # handed to get() through the future
+            with self._lock:
+                self.stats.errors += 1
+                del self._pending[key]
+            future.set_exception(error)
+            return
+        with self._lock:
+            del self._pending[key]
+            self._remember(key, text, origin)
+        future.set_result(text)
+        if self.store and origin == "api":
+            try:
+                self.store.save(key, text)
+            except Exception:  # the answer is still cached in memory
+                pass
+
+    def prefetch(self, key: AdviceKey) -> None:
+        """Start fetching the advice for key unless it is cached or already on its way."""
+        with self._lock:
+            self.stats.prefetches += 1
+            if self._cached(key) is None and key not in self._pending:
+                self._start(key)
+
+    def get(self, key: AdviceKey, timeout: float = None) -> Advice:
+        """
+        The advice for key, waiting at most timeout seconds for the API.
+
+        Args:
+            key (AdviceKey): The game state.
+            timeout (float, optional): Seconds to wait; defaults to self.timeout.
+
+        Returns:
+            Advice: The cached or fetched answer, or the local strategy's answer if the
+                request failed or did not finish in time.
+        """
+        with self._lock:
+            self.stats.lookups += 1
+            text = self._cached(key)
+            future = None
+            if text is None:
+                future = self._pending.get(key) or self._start(key)
+        if future is not None:
+            try:
+                text = future.result(self.timeout if timeout is None else timeout)
+            except Exception:  # timed out or failed; a late answer is still cached
+                with self._lock:
+                    self.stats.fallbacks += 1
+                return Advice(local_advice(key), "local")
+        with self._lock:
+            origin = self._unread.pop(key, None)
+            if origin is None:
+                self.stats.memory_hits += 1
+            elif origin == "store":
+                self.stats.store_hits += 1
+        if origin == "store":
+            try:
+                self.store.count_hit(key)
+            except Exception:  # only the statistic is lost
+                pass
+        return Advice(text, "api" if origin == "api" else "cache")
+
+    def __repr__(self):
+        return (f"<AdviceClient(timeout={self.timeout}, ttl={self.ttl}, "
+                f"cached={len(self._cache)}, pending={len(self._pending)})>")
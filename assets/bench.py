@@ -0,0 +1,325 @@
+# benchmarks for the game's storage and hot paths
+#
+#   python bench.py db -n 100000
+#   python bench.py ingest -n 1000000
+#   python bench.py hot --json before.json
+#   python bench.py hot --compare before.json
+#
+# Every command can save its results as JSON with --json, along with the commit and
+# Python version they were measured on, so runs on different commits can be compared.
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import timeit
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy.orm import sessionmaker
+
+from blackjack import (
+    calculate_hand_value, create_deck, deal_card, display_hand, record_game_session, shuffle_deck,
+    update_hi_lo_count,
+)
+from cards import hand_value, new_shoe
+from hand import Hand
+from ingest import DEFAULT_BATCH_SIZE, SessionWriter
+from models import DB_PROFILES, Player, get_db_engine, init_db
+from play_sound import NullAudioBackend, get_audio_backend, set_audio_backend
+from simulator import simulate
+
+console = Console()
+
+# one hand per outcome, cycled through while recording
+SAMPLE_HANDS = (
+    ([0, 9], [22, 31], "Win"),
+    ([5, 6, 20], [12, 7], "Loss"),
+    ([10, 45], [23, 44], "Tie"),
+)
+# amount returned per unit bet on each of the SAMPLE_HANDS
+SAMPLE_PAYOUTS = (2.0, 0.0, 1.0)
+
+
+def bench_record_sessions(n_sessions: int = 100000, profile: str = "performance") -> Dict[str, float]:
+    """
+    Time recording game sessions into a fresh SQLite file, one commit per session.
+
+    This is the write pattern of interactive play, where every round is committed on
+    its own (see ledger.Ledger), so it measures the cost of a commit under the profile.
+
+    Args:
+        n_sessions (int, optional): Number of sessions to record.
+        profile (str, optional): The engine profile, see models.get_db_engine.
+
+    Returns:
+        Dict[str, float]: The profile, session count, seconds taken and sessions per second.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        engine = get_db_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}", profile)
+        init_db(engine)
+        Session = sessionmaker(bind=engine, expire_on_commit=False)
+        with Session() as session:
+            player = Player(name="bench")
+            session.add(player)
+            session.commit()
+            start = time.perf_counter()
+            for i in range(n_sessions):
+                dealer_hand, player_hand, outcome = SAMPLE_HANDS[i % len(SAMPLE_HANDS)]
+                record_game_session(session, player.id, dealer_hand, player_hand, outcome)
+            elapsed = time.perf_counter() - start
+        engine.dispose()
+    return {
+        "profile": profile,
+        "sessions": n_sessions,
+        "seconds": elapsed,
+        "sessions_per_sec": n_sessions / elapsed if elapsed else 0.0,
+    }
+
+
+def bench_ingest(n_rows: int = 1000000, batch_size: int = DEFAULT_BATCH_SIZE,
+                 profile: str = "performance") -> Dict[str, float]:
+    """Time bulk-inserting game sessions through a SessionWriter into a fresh SQLite file."""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = get_db_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}", profile)
+        init_db(engine)
+        rows = [
+            (1, hand_value(dealer_hand), hand_value(player_hand), outcome, 1, payout, 1)
+            for (dealer_hand, player_hand, outcome), payout in zip(SAMPLE_HANDS, SAMPLE_PAYOUTS)
+        ]
+        start = time.perf_counter()
+        with SessionWriter(engine, batch_size) as writer:
+            for i in range(n_rows):
+                writer.write(rows[i % len(rows)])
+        elapsed = time.perf_counter() - start
+        engine.dispose()
+    return {
+        "profile": profile,
+        "batch_size": batch_size,
+        "rows": n_rows,
+        "seconds": elapsed,
+        "rows_per_sec": n_rows / elapsed if elapsed else 0.0,
+    }
+
+
+def time_per_call(func: Callable[[], object], repeat: int = 5) -> Dict[str, float]:
+    """
+    Time a function the way timeit does: in loops long enough to measure, best of repeat.
+
+    Args:
+        func (callable): The code to time, called without arguments.
+        repeat (int, optional): Number of loops; the fastest is kept, as the slower
+            ones only add noise from the rest of the machine.
+
+    Returns:
+        Dict[str, float]: Calls per loop and microseconds per call.
+    """
+    timer = timeit.Timer(func)
+    calls, _ = timer.autorange()
+    seconds = min(timer.repeat(repeat, calls)) / calls
+    return {"calls": calls, "usec_per_call": seconds * 1e6}
+
+
+def bench_hot_paths(repeat: int = 5, n_sessions: int = 2000, n_rounds: int = 100000,
+                    seed: int = 0) -> List[Dict[str, object]]:
+    """
+    Time the functions every round of the game goes through.
+
+    Sounds go to a NullAudioBackend and hands are rendered to a console writing into a
+    string, so only the game's own code is measured. Recording is timed over a fixed
+    number of sessions, one commit each, as the database grows with every call; whole
+    rounds are timed through the headless simulator.
+
+    Args:
+        repeat (int, optional): Loops per function, see time_per_call.
+        n_sessions (int, optional): Game sessions recorded into a fresh SQLite file.
+        n_rounds (int, optional): Headless rounds played.
+        seed (int, optional): Seed of the shoes and sample hands, so every run times the same work.
+
+    Returns:
+        List[Dict[str, object]]: One result per benchmark, named by its "benchmark" key.
+    """
+    previous_backend = get_audio_backend()
+    set_audio_backend(NullAudioBackend())
+    try:
+        rng = random.Random(seed)
+        results = []
+
+        def add(name: str, func: Callable[[], object]) -> None:
+            results.append({"benchmark": name, **time_per_call(func, repeat)})
+
+        for num_decks in (1, 6):
+            add(f"create_deck+shuffle_deck ({num_decks} decks)",
+                lambda: shuffle_deck(create_deck(num_decks, rng=rng)))
+        deck = create_deck(6, rng=rng)
+        shuffle_deck(deck)
+        add("deal_card", lambda: deal_card(deck))
+
+        cards = list(new_shoe(1))
+        for size in (2, 3, 5, 8):
+            codes = rng.sample(cards, size)
+            hand = Hand(codes)
+            add(f"calculate_hand_value (list, {size} cards)", lambda: calculate_hand_value(codes))
+            add(f"calculate_hand_value (Hand, {size} cards)", lambda: calculate_hand_value(hand))
+
+        hi_lo_count = {"count": 0}
+        card = cards[0]
+        add("update_hi_lo_count", lambda: update_hi_lo_count(card, hi_lo_count))
+
+        null_console = Console(file=io.StringIO(), width=80)
+        shown = Hand(rng.sample(cards, 3))
+
+        def render() -> None:
+            display_hand(shown, "Player", output=null_console)
+            null_console.file.seek(0)
+            null_console.file.truncate()
+
+        add("display_hand (3 cards)", render)
+
+        recorded = bench_record_sessions(n_sessions)
+        results.append({
+            "benchmark": "record_game_session (SQLite)",
+            "calls": n_sessions,
+            "usec_per_call": recorded["seconds"] / n_sessions * 1e6,
+        })
+
+        played = simulate(n_rounds, seed=seed)
+        results.append({
+            "benchmark": "headless round",
+            "calls": n_rounds,
+            "usec_per_call": played.elapsed / n_rounds * 1e6,
+        })
+    finally:
+        set_audio_backend(previous_backend)
+    return results
+
+
+def git_commit() -> Optional[str]:
+    """The commit the working tree is on, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(path: str, command: str, results: List[Dict[str, object]]) -> None:
+    """Write results to a JSON file with the commit, Python and machine they were measured on."""
+    with open(path, "w") as file:
+        json.dump({
+            "command": command,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.platform(),
+            "results": results,
+        }, file, indent=2)
+    console.print(f"Results saved to {path}")
+
+
+def compare_results(results: List[Dict[str, object]], baseline_path: str, threshold: float = 0.1) -> None:
+    """
+    Show each hot path next to its time in a file saved by save_results.
+
+    Args:
+        results (list): Results of bench_hot_paths.
+        baseline_path (str): JSON file saved by an earlier run, e.g. on another commit.
+        threshold (float, optional): Slowdown, as a fraction, shown as a regression.
+    """
+    with open(baseline_path) as file:
+        baseline = json.load(file)
+    before = {result["benchmark"]: result["usec_per_call"] for result in baseline["results"]}
+    table = Table(
+        title=f"Hot paths against {baseline.get('commit') or baseline_path}",
+        show_header=True, header_style="bold blue",
+    )
+    table.add_column("Benchmark")
+    for column in ("Before (µs)", "Now (µs)", "Change"):
+        table.add_column(column, justify="right")
+    for result in results:
+        now = result["usec_per_call"]
+        old = before.get(result["benchmark"])
+        if old is None:
+            table.add_row(result["benchmark"], "-", f"{now:,.3f}", "new")
+            continue
+        change = now / old - 1
+        style = "red" if change > threshold else "green" if change < -threshold else ""
+        table.add_row(result["benchmark"], f"{old:,.3f}", f"{now:,.3f}", f"[{style}]{change:+.1%}[/]" if style else f"{change:+.1%}")
+    console.print(table)
+
+
+def format_value(value: object) -> str:
+    """A result value for display; large rates read better as whole numbers."""
+    if isinstance(value, float):
+        return f"{value:,.0f}" if value >= 1000 else f"{value:,.3f}"
+    return str(value)
+
+
+def display_results(title: str, results: List[Dict[str, float]]) -> None:
+    table = Table(title=title, show_header=True, header_style="bold blue")
+    for column, value in results[0].items():
+        # names read from the left, numbers from the right
+        table.add_column(
+            column.replace("_", " ").title(), justify="left" if isinstance(value, str) else "right", no_wrap=True,
+        )
+    for result in results:
+        table.add_row(*(format_value(value) for value in result.values()))
+    console.print(table)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Blackjack benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    # --json is accepted by every command
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--json", metavar="PATH", help="Also save the results to this JSON file")
+    db_parser = subparsers.add_parser("db", parents=[common], help="Record game sessions under each engine profile")
+    db_parser.add_argument("-n", "--sessions", type=int, default=100000, help="Sessions to record per profile")
+    db_parser.add_argument(
+        "-p", "--profile", action="append", choices=DB_PROFILES,
+        help="Profile to measure; repeat for several (defaults to all)",
+    )
+    ingest_parser = subparsers.add_parser("ingest", parents=[common], help="Bulk-insert game sessions through a SessionWriter")
+    ingest_parser.add_argument("-n", "--rows", type=int, default=1000000, help="Rows to insert")
+    ingest_parser.add_argument(
+        "-b", "--batch-size", type=int, action="append", help="Batch size to measure; repeat for several"
+    )
+    ingest_parser.add_argument("-p", "--profile", choices=DB_PROFILES, default="performance", help="Engine profile")
+    hot_parser = subparsers.add_parser(
+        "hot", parents=[common], help="Time dealing, hand values, counting, rendering, recording and whole rounds"
+    )
+    hot_parser.add_argument("-r", "--repeat", type=int, default=5, help="Timing loops per benchmark; the best is kept")
+    hot_parser.add_argument("-s", "--sessions", type=int, default=2000, help="Game sessions to record")
+    hot_parser.add_argument("-n", "--rounds", type=int, default=100000, help="Headless rounds to play")
+    hot_parser.add_argument("--compare", metavar="PATH", help="Compare with results saved by an earlier --json")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    if args.command == "db":
+        results = [bench_record_sessions(args.sessions, profile) for profile in args.profile or DB_PROFILES]
+        display_results("Recording game sessions", results)
+    elif args.command == "ingest":
+        batch_sizes = args.batch_size or [1000, DEFAULT_BATCH_SIZE, 100000]
+        results = [bench_ingest(args.rows, batch_size, args.profile) for batch_size in batch_sizes]
+        display_results("Bulk ingestion", results)
+    elif args.command == "hot":
+        results = bench_hot_paths(args.repeat, args.sessions, args.rounds)
+        display_results("Hot paths", results)
+        if args.compare:
+            compare_results(results, args.compare)
+    if args.json:
+        save_results(args.json, args.command, results)
+
+
+if __name__ == "__main__":
+    main()
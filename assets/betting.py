@@ -1,14 +1,15 @@
 from prompt_toolkit import prompt
 from rich.console import Console
 from play_sound import coin_sound
+from rules import max_table_bet
 console = Console
 
 def place_bets(session, max_bet, player_id, 
-               function_one, function_two):
+               function_one, function_two, read=prompt):
     while True:
         try:
             print(f"Max table bet is {max_bet}:")
-            bet_input = prompt(f"Please place your bet a number up to {max_bet}: ").strip()
+            bet_input = read(f"Please place your bet a number up to {max_bet}: ").strip()
             bet = int(bet_input)
             if bet < 1 or bet > max_bet:
                 print(f"Please enter a valid bet amount from $1 to ${max_bet}.")
@@ -24,36 +25,29 @@ def place_bets(session, max_bet, player_id,
         except ValueError:
             print("Invalid input. Please enter a numerical value.")
             
-def table_bets(session, player_id, money_bag, get_player_money_bag, update_player_money_bag):
-    
-    if  1 <= money_bag <=250:
-        max_bet = 20
-        print(f"You currently have ${money_bag}.")
-        bet = place_bets(session, max_bet, player_id, get_player_money_bag, update_player_money_bag)
-        return bet
-    
-    elif 251 <= money_bag <=500:
-        max_bet = 50
-        print(f"You currently have ${money_bag}.")
-        bet = place_bets(session, max_bet, player_id, get_player_money_bag, update_player_money_bag)
-        return bet
-    elif 501 <= money_bag <=1000:
-        max_bet = 100
-        print(f"You currently have ${money_bag}.")
-        bet = place_bets(session, max_bet, player_id, get_player_money_bag, update_player_money_bag)
-        return bet
-    elif 1001 <= money_bag <=5000:
-        max_bet = 250
-        print(f"You currently have ${money_bag}.")
-        bet = place_bets(session, max_bet, player_id, get_player_money_bag, update_player_money_bag)
-        return bet
-    elif 5001 <= money_bag <=10000:
-        max_bet = 500
-        print(f"You currently have ${money_bag}.")
-        bet = place_bets(session, max_bet, player_id, get_player_money_bag, update_player_money_bag)
-        return bet
-    elif 10001 < money_bag:
-        max_bet = 1000
-        print(f"You currently have ${money_bag}.")
-        bet = place_bets(session, max_bet, player_id, get_player_money_bag, update_player_money_bag)
-        return bet
\ No newline at end of file
+def place_fixed_bet(session, max_bet, player_id, bet,
+                    function_one, function_two):
+    """Bet the same amount without asking, lowered to the table limit and the funds left."""
+    current_money_bag = function_one(session, player_id)
+    bet = max(1, min(bet, max_bet, int(current_money_bag)))
+    print(f"Betting {bet}.")
+    function_two(session, player_id, current_money_bag - bet)
+    coin_sound()
+    return bet
+
+def table_bets(session, player_id, money_bag, get_player_money_bag, update_player_money_bag,
+               fixed_bet=None, read=prompt):
+    """
+    Take the round's bet from the money bag.
+
+    Args:
+        fixed_bet (int, optional): Bet this amount instead of asking, e.g. for scripts.
+        read (callable, optional): Asks for the bet; prompt_toolkit's prompt by default,
+            input() when stdin is not a terminal.
+    """
+    max_bet = max_table_bet(money_bag)
+    print(f"You currently have ${money_bag}.")
+    if fixed_bet is not None:
+        return place_fixed_bet(session, max_bet, player_id, fixed_bet, get_player_money_bag, update_player_money_bag)
+    bet = place_bets(session, max_bet, player_id, get_player_money_bag, update_player_money_bag, read)
+    return bet
@@ -1,141 +1,131 @@
+import argparse
+import csv
+import itertools
+import json
 import os
 import random
-import openai
-import pygame
-from typing import List, Dict
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, List, Dict, NamedTuple, Optional, Tuple, Union
 from rich.console import Console
 from rich.table import Table
-from prompt_toolkit import prompt
-from sqlalchemy.orm import sessionmaker
-from ascii import deck_of_cards
-from betting import place_bets, table_bets
-from config import RANKS, SUITS, VALUES, header, instructions
-from models import GameSession, Player, get_db_engine, init_db
+from cards import CARD_VALUES, HI_LO_TAGS, hand_value
+from counting_sim import DEFAULT_RAMP, parse_ramp, simulate_counting_parallel
+from hand import Hand
+from hand_record import ACTION_CODES, encode_hand_record
+from config import (
+    BLACKJACK_PAYOUT, DEALER_STANDS_ON, HELP_EXACT_DEPTH, PUSH_PAYOUT, WIN_PAYOUT,
+    header, instructions
+)
+from rules import HOUSE_RULES, Rules
+from shoe import Shoe
+from simulator import STRATEGIES, Strategy, simulate_parallel
+from dealer_odds import clear_cache as clear_dealer_odds, composition_of
+from ev_solver import action_values, clear_cache as clear_ev_cache
 from dotenv import load_dotenv
+from renderer import print_frame, render_hand
+from screen import TableScreen
 from play_sound import (
     play_card_draw_sound, play_loss_sound, play_shuffle_sound,
     play_win_sound, play_again_sound, play_start_sound, play_cheer_sound
 )
 
+# SQLAlchemy, openai and prompt_toolkit take most of a cold start, and the menu needs
+# none of them: the database layer is imported when the first game or view opens it,
+# openai by the first AI advice request and prompt_toolkit by the first bet.
+if TYPE_CHECKING:
+    from advice import AdviceClient
+    from history import PlayerSummary
+    from ledger import Ledger
+    from models import Player
+
 console = Console()
 
+VIEW_PAGE_SIZE = 20
+OUTPUT_FORMATS = ("table", "json", "csv")
+# periods stats --by can total games over, see history.BUCKET_FORMATS
+BUCKET_PERIODS = ("hour", "day", "week", "month")
+
 
 def configure() -> None:
-    """Load environment variables and configure OpenAI API key."""
+    """Load environment variables, including the OpenAI API key read by advice.py."""
     load_dotenv()
-    openai.api_key = os.getenv("OPENAI_API_KEY")
 
-# Get play suggestion from OpenAI based on game state 
-def get_play_suggestion(state: Dict[str, List[Dict[str, str]]], hi_lo_count: int) -> str:
+
+def create_deck(
+    num_decks: int = HOUSE_RULES.num_decks,
+    penetration: float = HOUSE_RULES.penetration,
+    rng: random.Random = None,
+) -> Shoe:
     """
-    Get a play suggestion from OpenAI based on the current game state.
+    Create a new shoe of standard 52-card decks.
     
     Args:
-        state (dict): A dictionary representing the current game state, including:
-            - 'player_hand': List of dictionaries representing the player's cards
-            - 'dealer_hand': List of dictionaries representing the dealer's cards
-    
-    Returns:
-        str: The suggested action for the player (e.g., "hit" or "stand")
-    """
-    prompt_text = (
-        f"Given the current game state:\n"
-        f"Player hand: {state['player_hand']}\n"
-        f"Dealer hand: {state['dealer_hand']}\n"
-        f"Current Hi-Lo count: {hi_lo_count}\n"
-        f"Should I hit or stand?"
-    )
-    response = openai.Completion.create(
-        model="gpt-3.5-turbo-instruct",
-        prompt=prompt_text,
-        temperature=0.1,
-        max_tokens=75,
-    )
-    return response.choices[0].text.strip()
-
+        num_decks (int, optional): Number of decks in the shoe, 1 to 8.
+        penetration (float, optional): Fraction of the shoe dealt before the cut card comes out.
+        rng (random.Random, optional): The generator to shuffle with, so a seeded game can be
+            reproduced. Defaults to a fresh unseeded generator.
 
-def create_deck() -> List[Dict[str, str]]:
-    """
-    Create a new standard deck of 52 playing cards.
-    
     Returns:
-        List[Dict[str, str]]: A list of dictionaries representing each card in the deck,
-            where each dictionary contains the 'suit' and 'rank' of the card.
+        Shoe: The unshuffled shoe.
     """
-    num_decks = 1
-    return [{"suit": suit, "rank": rank} for suit in SUITS for rank in RANKS for _ in range(num_decks)]
-
+    return Shoe(num_decks, penetration, rng)
 
 
-def shuffle_deck(deck: List[Dict[str, str]]) -> None:
-    """Shuffle the given deck of cards in-place."""
+def shuffle_deck(deck: Shoe) -> None:
+    """Gather every card back into the shoe and shuffle it."""
     play_shuffle_sound()
-    random.shuffle(deck)
+    deck.shuffle()
 
 
-def deal_card(deck: List[Dict[str, str]]) -> Dict[str, str]:
-    """Deal a single card from the top of the deck."""
+def deal_card(deck: Shoe) -> int:
+    """Deal a single card from the shoe."""
     play_card_draw_sound()
-    return deck.pop()
+    return deck.deal()
 
 
-def calculate_hand_value(hand: List[Dict[str, str]]) -> int:
+def calculate_hand_value(hand: Union[Hand, List[int]]) -> int:
     """Calculate the total value of a hand according to blackjack rules."""
-    value = sum(VALUES[card["rank"]] for card in hand)
-    aces = sum(card["rank"] == "Ace" for card in hand)
-    while value > 21 and aces:
-        value -= 10
-        aces -= 1
-    return value
+    if isinstance(hand, Hand):
+        return hand.value
+    return hand_value(hand)
 
 
 def display_hand(
-    hand: List[Dict[str, str]],
+    hand: Union[Hand, List[int]],
     player: str,
     hide_dealer_card: bool = False,
     calculate_value: bool = True,
+    output: Console = None,
 ) -> None:
     """
     Display a hand of cards using ASCII art.
     
     Args:
-        hand (list): A list of dictionaries representing the cards in the hand
+        hand (list): The card codes in the hand
         player (str): The name of the player whose hand is being displayed
         hide_dealer_card (bool, optional): Whether to hide the dealer's second card. Defaults to False.
         calculate_value (bool, optional): Whether to display the total value of the hand. Defaults to True.
+        output (Console, optional): The console to print to. Defaults to the game's console.
     """
-    console.print(f"[bold blue]{player}'s hand:[/bold blue]")
-    card_names = []
-    ascii_arts = []
-    for i, card in enumerate(hand):
-        if hide_dealer_card and player == "Dealer" and i == 1:
-            card_name = "Hidden"
-            ascii_art = deck_of_cards["Card Back"].split("\n")
-        else:
-            card_name = f"{card['rank']} of {card['suit']}"
-            ascii_art = deck_of_cards.get(card_name, "Card not found").split("\n")
-        card_names.append(card_name)
-        ascii_arts.append(ascii_art)
-
-    max_height = max(len(art) for art in ascii_arts)
+    value = calculate_hand_value(hand) if calculate_value else None
+    print_frame(output or console, render_hand(hand, player, hide_dealer_card, value))
 
-    for card_name in card_names:
-        console.print(card_name.center(len(ascii_arts[0])))
 
-    for row in range(max_height):
-        for ascii_art in ascii_arts:
-            if row < len(ascii_art):
-                console.print(ascii_art[row], end=" ")
-            else:
-                console.print(" " * len(ascii_art[0]), end=" ")
-        console.print()
-
-    if calculate_value:
-        console.print(f"Value: {calculate_hand_value(hand)}\n")
+def open_session(expire_on_commit: bool = True):
+    """Open a session on the configured database, creating or upgrading its schema first."""
+    from sqlalchemy.orm import sessionmaker
+    from models import get_configured_db_engine, init_db
+    engine = get_configured_db_engine()
+    init_db(engine)
+    return sessionmaker(bind=engine, expire_on_commit=expire_on_commit)()
 
 
-def get_or_create_player(session, name: str) -> Player:
+def get_or_create_player(session, name: str) -> "Player":
     """Retrieve a player from the database or create a new one."""
+    from models import Player
     player = session.query(Player).filter_by(name=name).first()
     if player is None:
         player = Player(name=name)
@@ -146,13 +136,16 @@ def get_or_create_player(session, name: str) -> Player:
 
 def get_player_money_bag(session, player_id: int) -> int:
     """Retrieve the money bag amount for a player from the database."""
-    player = session.query(Player).filter_by(id=player_id).first()
+    from models import Player
+    # session.get answers from the identity map when the player is already loaded
+    player = session.get(Player, player_id)
     return player.money_bag if player else None
 
 
 def update_player_money_bag(session, player_id: int, new_amount: int) -> None:
     """Update a player's money bag amount in the database."""
-    player = session.query(Player).filter_by(id=player_id).first()
+    from models import Player
+    player = session.get(Player, player_id)
     if player:
         player.money_bag = new_amount
         session.commit()
@@ -163,19 +156,52 @@ def update_player_money_bag(session, player_id: int, new_amount: int) -> None:
 def record_game_session(
     session,
     player_id: int,
-    dealer_hand: List[Dict[str, str]],
-    player_hand: List[Dict[str, str]],
+    dealer_hand: Union[Hand, List[int]],
+    player_hand: Union[Hand, List[int]],
     outcome: str,
+    commit: bool = True,
+    bet: int = None,
+    payout: float = None,
+    true_count: float = None,
+    actions: List[str] = (),
+    num_decks: int = None,
+    shoe_seed: int = None,
+    shoe_position: int = None,
 ) -> None:
-    """Record a completed game session in the database."""
+    """
+    Record a completed game session in the database.
+
+    Pass commit=False when a Ledger commits the round, so the hand is stored in the
+    same transaction as the money it moved. The cards of both hands and the actions
+    are stored packed, see hand_record.py. With the shoe's seed and position the round
+    can be dealt again by replay.py.
+
+    Args:
+        bet (int, optional): The amount bet.
+        payout (float, optional): The amount returned to the player, bet included.
+        true_count (float, optional): The hi-lo true count when the cards were dealt.
+        actions (list, optional): The actions the player took, in order.
+        num_decks (int, optional): Number of decks in the shoe.
+        shoe_seed (int, optional): Seed of the shoe's shuffle, see Shoe.shuffle.
+        shoe_position (int, optional): Position in the shoe of the first card dealt.
+    """
+    from models import GameSession
     game_session = GameSession(
         player_id=player_id,
         dealer_hand_value=calculate_hand_value(dealer_hand),
         player_hand_value=calculate_hand_value(player_hand),
         outcome=outcome,
+        bet=bet,
+        payout=payout,
+        true_count=true_count,
+        hand_data=encode_hand_record(player_hand, dealer_hand, actions),
+        num_decks=num_decks,
+        shoe_seed=shoe_seed,
+        shoe_position=shoe_position,
     )
     session.add(game_session)
-    session.commit()
+    if commit:
+        session.commit()
 
 
 def get_user_input(prompt_text: str, allow_empty=False) -> str:
@@ -186,206 +212,953 @@ def get_user_input(prompt_text: str, allow_empty=False) -> str:
             console.print("Invalid input. Please try again.", style="bold red")
             
             
+def help_exact_depth() -> int:
+    """The exact depth of the EVs shown by help, from BLACKJACK_HELP_DEPTH or config.HELP_EXACT_DEPTH."""
+    return int(os.getenv("BLACKJACK_HELP_DEPTH", HELP_EXACT_DEPTH))
+
+
 def update_hi_lo_count(card, hi_lo_count):
-    if card['rank'] in ['2', '3', '4', '5', '6']:
-        hi_lo_count['count'] += 1
-    elif card['rank'] in ['10', 'Jack', 'Queen', 'King', 'Ace']:
-        hi_lo_count['count'] -= 1
+    hi_lo_count['count'] += HI_LO_TAGS[card]
     # print(f"Current HI-Lo Count: {hi_lo_count['count']}")
 
 
+class RoundResult(NamedTuple):
+    """Everything play_game knows about a finished round, as stored by record_game_session."""
+    dealer_hand: Hand
+    player_hand: Hand
+    outcome: str
+    bet: int
+    payout: float
+    true_count: float
+    actions: List[str]
+    shoe_seed: int
+    shoe_position: int
+
+
 # Play a game of blackjack
-def play_game(session, player: Player, deck: List[Dict[str, str]], hi_lo_count: dict) -> None:
+def play_game(
+    session,
+    player: "Player",
+    deck: Shoe,
+    hi_lo_count: dict,
+    screen: TableScreen = None,
+    ledger: "Ledger" = None,
+    advisor: "AdviceClient" = None,
+    bet: int = None,
+    strategy: Strategy = None,
+    interactive: bool = True,
+) -> RoundResult:
     """
     Play a single game of blackjack.
     
     Args:
         session: The SQLAlchemy database session.
         player (Player): The player object representing the user playing the game.
+        deck (Shoe): The shoe to deal from; it is reshuffled first if the cut card has come out.
         hi_lo_count (dict): The dictionary storing the current Hi-Lo count.
+        screen (TableScreen, optional): The table view to play on; a new one is made if omitted.
+        ledger (Ledger, optional): The unit of work holding the player's money bag. The
+            caller commits it once the round is recorded; without one, the money moved
+            by this round is committed before returning.
+        advisor (AdviceClient, optional): Fetches AI advice for "help" in the background;
+            without one, "help" only shows the local suggestion.
+        bet (int, optional): Bet this amount instead of asking for the bet.
+        strategy (Strategy, optional): Choose hit or stand with this policy instead of asking.
+        interactive (bool, optional): False when stdin is not a terminal: questions are
+            read as plain lines and "press enter" pauses are skipped.
+
+    Returns:
+        RoundResult: The hands, outcome, bet, payout, true count at the deal, actions
+            and the shoe's seed and position at the deal.
+
+    Raises:
+        EOFError: When input runs out; the caller rolls back the round.
     """
     
+    from betting import table_bets
+    from ledger import Ledger
+
     if 'count' not in hi_lo_count:
         hi_lo_count['count'] = 0
+
+    if deck.needs_reshuffle:
+        console.print("Reshuffling the shoe...", style="bold blue")
+        shuffle_deck(deck)
         
     
-    player_id = player.id
-    current_money = get_player_money_bag(session, player_id)
+    own_ledger = ledger is None
+    ledger = ledger or Ledger(session, player.id)
+    current_money = ledger.money_bag
 
     if current_money < 1:
         print("Sorry you've had a string of bad luck. We're extending you $100 in credit.")
-        update_player_money_bag(session, player_id, 100)
+        ledger.money_bag = 100
         current_money = 100
-        prompt("Press enter to continue")
+        if interactive and bet is None and strategy is None:
+            from prompt_toolkit import prompt
+            prompt("Press enter to continue")
 
-    bet = table_bets(session, player_id, current_money, get_player_money_bag, update_player_money_bag)
+    if interactive:
+        from prompt_toolkit import prompt as read
+    else:
+        # prompt_toolkit needs a terminal; piped answers are read a line at a time
+        read = input
+    bet = table_bets(session, player.id, current_money, ledger.get_money_bag, ledger.set_money_bag, bet, read)
 
-    player_hand = [deal_card(deck), deal_card(deck)]
+    true_count = hi_lo_count['count'] / deck.remaining_decks
+    shoe_seed, shoe_position = deck.seed, deck.position
+    actions = []
+    player_hand = Hand((deal_card(deck), deal_card(deck)))
     for card in player_hand:
         update_hi_lo_count(card, hi_lo_count)
-    dealer_hand = [deal_card(deck), deal_card(deck)]
+    dealer_hand = Hand((deal_card(deck), deal_card(deck)))
     update_hi_lo_count(dealer_hand[0], hi_lo_count)
-    
-    display_hand([dealer_hand[0], {"rank": "Hidden", "suit": ""}], "Dealer", hide_dealer_card=True, calculate_value=False)
-    display_hand(player_hand, "Player", hide_dealer_card=False, calculate_value=True)
 
-    if calculate_hand_value(player_hand) == 21 and calculate_hand_value(dealer_hand) < 21:
-        print(f"{header}")
+    screen = screen or TableScreen(console)
+    screen.show_hands(dealer_hand, player_hand, hide_dealer_card=True)
+    screen.show_bankroll(ledger.money_bag, bet)
+    screen.show_count(hi_lo_count['count'], deck.remaining_decks)
+    with screen:
+        outcome, payout = _play_hands(
+            ledger, deck, hi_lo_count, bet, dealer_hand, player_hand, screen, actions, advisor, strategy
+        )
+        screen.show_bankroll(ledger.money_bag, bet)
+
+    if own_ledger:
+        ledger.end_round()
+    return RoundResult(
+        dealer_hand, player_hand, outcome, bet, payout, true_count, actions, shoe_seed, shoe_position
+    )
+
+
+def _play_hands(
+    ledger: "Ledger",
+    deck: Shoe,
+    hi_lo_count: dict,
+    bet: int,
+    dealer_hand: Hand,
+    player_hand: Hand,
+    screen: TableScreen,
+    actions: List[str],
+    advisor: "AdviceClient" = None,
+    strategy: Strategy = None,
+) -> Tuple[str, float]:
+    """
+    Play out the dealt hands on the table screen and settle the bet in the ledger.
+
+    Every valid action the player types, or the strategy picks, is appended to actions.
+    Returns the outcome and the amount paid back to the player.
+    """
+    if player_hand.value == 21 and dealer_hand.value < 21:
+        console.print(header)
         play_cheer_sound()
-        print("You hit blackjack!")
-        new_amount = get_player_money_bag(session, player_id) + (2.5 * bet)
-        update_player_money_bag(session, player_id, new_amount)
-        return dealer_hand, player_hand, "Win"
+        console.print("You hit blackjack!")
+        ledger.money_bag += BLACKJACK_PAYOUT * bet
+        return "Win", BLACKJACK_PAYOUT * bet
 
-    while calculate_hand_value(player_hand) < 21:
-        action = get_user_input("Do you want to hit, stand or get help? ")
+    key = None
+    while player_hand.value < 21:
+        if advisor:
+            from advice import advice_key
+            state = advice_key(player_hand, dealer_hand[0], hi_lo_count['count'])
+            if state != key:
+                # a new decision: ask now, so the advice is likely in by the time the player types help
+                key = state
+                advisor.prefetch(key)
+        if strategy:
+            action = strategy(player_hand.value, player_hand.is_soft, CARD_VALUES[dealer_hand[0]])
+            console.print(f"Strategy plays: {action}")
+        else:
+            action = screen.ask("Do you want to hit, stand or get help? ")
+        if action in ACTION_CODES:
+            actions.append(action)
         if action == "hit":
             new_card = deal_card(deck)
-            player_hand.append(new_card)
+            player_hand.add_card(new_card)
             update_hi_lo_count(new_card, hi_lo_count)
-            os.system("clear")
-            display_hand([dealer_hand[0], {"rank": "Hidden", "suit": ""}], "Dealer", hide_dealer_card=True, calculate_value=False)
-            display_hand(player_hand, "Player")
+            screen.show_hands(dealer_hand, player_hand, hide_dealer_card=True)
+            screen.show_count(hi_lo_count['count'], deck.remaining_decks)
         elif action == "stand":
             break
         elif action == "help":
-            suggestion = get_play_suggestion(
-                {"player_hand": player_hand, "dealer_hand": dealer_hand,}, hi_lo_count['count']
-            )
-            console.print("Suggested play:", style="bold green")
-            console.print(suggestion)
+            # the hole card is still unseen, so it belongs to the composition with the shoe
+            unseen = composition_of(itertools.chain(deck, dealer_hand.cards[1:]))
+            values = action_values(player_hand, dealer_hand[0], unseen, exact_depth=help_exact_depth())
+            suggestion = max(values, key=values.get)
+            console.print(f"Suggested play: {suggestion}", style="bold green")
+            console.print(", ".join(f"{name} EV {value:+.3f}" for name, value in values.items()))
+            if advisor:
+                console.print(advisor.get(key).text)
 
     console.print("Revealing Dealer's Hand...")
-    display_hand(dealer_hand, "Dealer", hide_dealer_card=False, calculate_value=True)
     update_hi_lo_count(dealer_hand[1], hi_lo_count)
-    while calculate_hand_value(dealer_hand) < 17:
+    screen.show_hands(dealer_hand, player_hand, hide_dealer_card=False)
+    screen.show_count(hi_lo_count['count'], deck.remaining_decks)
+    while dealer_hand.value < DEALER_STANDS_ON:
         new_card = deal_card(deck)
-        dealer_hand.append(new_card)
+        dealer_hand.add_card(new_card)
         update_hi_lo_count(new_card, hi_lo_count)
-        display_hand(dealer_hand, "Dealer", hide_dealer_card=False, calculate_value=True)
+        screen.show_hands(dealer_hand, player_hand, hide_dealer_card=False)
+        screen.show_count(hi_lo_count['count'], deck.remaining_decks)
 
-    player_hand_value = calculate_hand_value(player_hand)
-    dealer_hand_value = calculate_hand_value(dealer_hand)
+    player_hand_value = player_hand.value
+    dealer_hand_value = dealer_hand.value
 
     if player_hand_value > 21:
         play_loss_sound()
         console.print("Player busts! Dealer wins.")
         outcome = "Loss"
+        payout = 0
     elif dealer_hand_value > 21:
         play_win_sound()
         console.print("Dealer busts! Player wins.")
-        new_amount = get_player_money_bag(session, player_id) + (2 * bet)
-        update_player_money_bag(session, player_id, new_amount)
+        payout = WIN_PAYOUT * bet
+        ledger.money_bag += payout
         outcome = "Win"
     elif player_hand_value > dealer_hand_value:
         play_win_sound()
-        new_amount = get_player_money_bag(session, player_id) + (2 * bet)
-        update_player_money_bag(session, player_id, new_amount)
+        payout = WIN_PAYOUT * bet
+        ledger.money_bag += payout
         console.print("Player wins!")
         outcome = "Win"
     elif player_hand_value < dealer_hand_value:
         play_loss_sound()
         console.print("Dealer wins!")
         outcome = "Loss"
+        payout = 0
     else:
         console.print("It's a tie!")
         play_loss_sound()
-        new_amount = get_player_money_bag(session, player_id) + bet
-        update_player_money_bag(session, player_id, new_amount)
+        payout = PUSH_PAYOUT * bet
+        ledger.money_bag += payout
         outcome = "Tie"
 
     play_again_sound()
+    return outcome, payout
 
-    return dealer_hand, player_hand, outcome
 
+def blackjack_game(
+    session,
+    player_name: str = None,
+    num_decks: int = HOUSE_RULES.num_decks,
+    seed: int = None,
+    rounds: int = None,
+    bet: int = None,
+    strategy: Strategy = None,
+) -> None:
+    """
+    The main game loop for playing multiple rounds of blackjack.
+
+    When stdin is not a terminal, e.g. in a batch job, answers are read from it a line
+    at a time and nobody is asked whether to play again: the game ends after rounds
+    rounds or when the input runs out. A round cut short by the end of input is rolled
+    back, bet included.
 
-def blackjack_game(session) -> None:
-    """The main game loop for playing multiple rounds of blackjack."""
-    os.system("clear")
+    Args:
+        session: The SQLAlchemy database session.
+        player_name (str, optional): The player; asked for when omitted.
+        num_decks (int, optional): Number of decks in the shoe.
+        seed (int, optional): Seed of the shoe's generator, to deal the same game again.
+        rounds (int, optional): Stop after this many rounds instead of asking after each one.
+        bet (int, optional): Bet this amount every round instead of asking.
+        strategy (Strategy, optional): Play every hand with this policy instead of asking.
+    """
+    from ledger import Ledger
+    interactive = sys.stdin.isatty()
+    # nobody to ask when the input is scripted or every decision is made automatically
+    ask_to_continue = rounds is None and interactive and (bet is None or strategy is None)
+    console.clear()
     console.print(header)
     console.print(instructions)
     play_start_sound()
     
-    player_name = get_user_input("Please enter your player name: ", allow_empty=False)
+    if not player_name:
+        player_name = get_user_input("Please enter your player name: ", allow_empty=False)
     player = get_or_create_player(session, player_name)
     
-     # Create and shuffle the shoe
-    deck = create_deck()
-    shuffle_deck(deck)
-    
     # Initialize Hi-Lo count
     hi_lo_count = {'count': 0}
 
+    # Create and shuffle the shoe with a generator owned by this game; the count
+    # starts over every time the shoe is reshuffled, and the odds memoized for the old
+    # shoe's compositions are dropped, as they never come up again
+    deck = create_deck(num_decks, rng=random.Random(seed))
+    deck.add_reshuffle_listener(lambda: hi_lo_count.update(count=0))
+    deck.add_reshuffle_listener(clear_dealer_odds)
+    deck.add_reshuffle_listener(clear_ev_cache)
+    shuffle_deck(deck)
+    screen = TableScreen(console)
+    advisor = None
+    if os.getenv("OPENAI_API_KEY") and strategy is None:
+        from advice import AdviceClient, AdviceStore
+        # AI answers are kept in the game's database, so they carry over to later games
+        advisor = AdviceClient(store=AdviceStore(session.get_bind()))
+
+    # the bet, the payout and the recorded hand of a round are committed together;
+    # a crash mid-round rolls all of them back
+    with Ledger(session, player.id) as ledger:
+        rounds_played = 0
+        while True:
+            console.clear()
+            console.print(f"Welcome back, {player_name}!")
+
+            # Start a new game with the existing player object
+            try:
+                result = play_game(
+                    session, player, deck, hi_lo_count, screen, ledger, advisor, bet, strategy, interactive
+                )
+            except EOFError:
+                ledger.rollback()
+                console.print("\nInput ended; the unfinished round was not recorded.", style="bold red")
+                break
+            record_game_session(
+                session, player.id, result.dealer_hand, result.player_hand, result.outcome, commit=False,
+                bet=result.bet, payout=result.payout, true_count=result.true_count, actions=result.actions,
+                num_decks=deck.num_decks, shoe_seed=result.shoe_seed, shoe_position=result.shoe_position,
+            )
+            ledger.end_round()
+            rounds_played += 1
+
+            if rounds is not None and rounds_played >= rounds:
+                break
+            if ask_to_continue:
+                play_again = get_user_input("Press Enter to play again or type 'no' to exit: ", allow_empty=True)
+                if play_again.lower() == "no":
+                    break
+
+    if interactive:
+        console.clear()
+    console.print(f"Thanks for playing! {rounds_played} rounds played.")
+    if advisor and advisor.stats.lookups:
+        stats = advisor.stats
+        console.print(
+            f"AI advice: {stats.hit_rate:.0%} of {stats.lookups} help requests answered "
+            f"from the cache, {stats.requests} API requests, {stats.fallbacks} fallbacks."
+        )
+
+
+def parse_date(text: str) -> Optional[datetime]:
+    """Parse a YYYY-MM-DD date; an empty string means no date."""
+    return datetime.strptime(text, "%Y-%m-%d") if text else None
+
+
+def prompt_view_filters() -> Tuple[Optional[str], Optional[datetime], Optional[datetime]]:
+    """Ask for the player and the date range to view; Enter skips a filter."""
+    player_name = get_user_input("Player name to view (Enter for everyone): ", allow_empty=True)
     while True:
-        os.system("clear")
-        console.print(f"Welcome back, {player_name}!")
+        try:
+            since = parse_date(get_user_input("From date YYYY-MM-DD (Enter for the start): ", allow_empty=True))
+            until = parse_date(get_user_input("To date YYYY-MM-DD (Enter for today): ", allow_empty=True))
+            break
+        except ValueError:
+            console.print("Dates look like 2024-01-31. Please try again.", style="bold red")
+    # the end date is inclusive, the query range is not
+    return player_name or None, since, until + timedelta(days=1) if until else None
+
+
+def display_outcome_summary(summaries: List["PlayerSummary"], with_streaks: bool = True) -> None:
+    """Display the per-player totals computed by history.outcome_summary."""
+    table = Table(title="Summary", show_header=True, header_style="bold blue")
+    table.add_column("Player Name", style="dim")
+    columns = ["Games", "Wins", "Losses", "Ties", "Net Hands", "Net Money"]
+    if with_streaks:
+        columns += ["Best Win Streak", "Worst Loss Streak", "Current"]
+    for column in columns:
+        table.add_column(column, justify="right")
+    for summary in summaries:
+        row = [
+            summary.name,
+            str(summary.games),
+            str(summary.wins),
+            str(summary.losses),
+            str(summary.ties),
+            f"{summary.net_hands:+d}",
+            f"{summary.net_money:+,.2f}",
+        ]
+        if with_streaks:
+            row += [str(summary.longest_win_streak), str(summary.longest_loss_streak), summary.current_streak]
+        table.add_row(*row)
+    console.print(table)
+
 
-        # Start a new game with the existing player object
-        dealer_hand, player_hand, outcome = play_game(session, player, deck, hi_lo_count)
-        record_game_session(session, player.id, dealer_hand, player_hand, outcome)
+def view_game_outcomes(
+    session,
+    player_name: str = None,
+    since: datetime = None,
+    until: datetime = None,
+    page_size: int = VIEW_PAGE_SIZE,
+    interactive: bool = True,
+    limit: int = None,
+) -> None:
+    """
+    View past game outcomes: a summary per player, then the games a page at a time.
+
+    Totals are computed by the database and pages are fetched one at a time, so the
+    view stays fast however long the history grows. Streaks are shown when viewing a
+    single player.
 
-        play_again = get_user_input("Press Enter to play again or type 'no' to exit: ", allow_empty=True)
-        if play_again.lower() == "no":
-            os.system("clear")
-            console.print("Thanks for playing!")
+    Args:
+        session: The SQLAlchemy database session.
+        player_name (str, optional): Only show this player's games.
+        since (datetime, optional): Only show games played at or after this time.
+        until (datetime, optional): Only show games played before this time.
+        page_size (int, optional): Games per page.
+        interactive (bool, optional): Ask before showing each further page; otherwise
+            every page is printed in turn.
+        limit (int, optional): Show at most this many games.
+    """
+    from history import outcome_summary, page_game_sessions
+
+    found, player_id = resolve_player_id(session, player_name)
+    if not found:
+        return
+
+    # streaks walk every game in range, so they are only worked out for a single player
+    with_streaks = player_id is not None
+    summaries = outcome_summary(session, player_id, since, until, with_streaks)
+    if not summaries:
+        console.print("No games played yet.")
+        return
+    display_outcome_summary(summaries, with_streaks)
+
+    before_id = None
+    remaining = limit
+    while True:
+        size = page_size if remaining is None else min(page_size, remaining)
+        page = page_game_sessions(session, size, before_id, player_id, since, until) if size > 0 else []
+        if not page:
             break
+        table = Table(show_header=True, header_style="bold blue")
+        table.add_column("Played", style="dim", no_wrap=True)
+        table.add_column("ID", style="dim")
+        table.add_column("Player Name", style="dim")
+        table.add_column("Dealer Hand", justify="right", style="dim")
+        table.add_column("Player Hand", justify="right", style="dim")
+        table.add_column("Outcome", justify="right", style="dim")
+        table.add_column("Bet", justify="right", style="dim")
+        table.add_column("Payout", justify="right", style="dim")
+        for game_session in page:
+            table.add_row(
+                f"{game_session.timestamp:%Y-%m-%d %H:%M}" if game_session.timestamp else "",
+                str(game_session.player_id),
+                game_session.name,
+                str(game_session.dealer_hand_value),
+                str(game_session.player_hand_value),
+                game_session.outcome,
+                "" if game_session.bet is None else str(game_session.bet),
+                "" if game_session.payout is None else f"{game_session.payout:g}",
+            )
+        console.print(table)
 
+        if remaining is not None:
+            remaining -= len(page)
+        if len(page) < size:
+            break
+        before_id = page[-1].id
+        if interactive and get_user_input("Press Enter for more or type 'q' to stop: ", allow_empty=True) == "q":
+            break
+
+
+def game_session_record(game_session) -> Dict[str, object]:
+    """A row of history.page_game_sessions as a plain dict for JSON or CSV output."""
+    return {
+        "id": game_session.id,
+        "played": game_session.timestamp.isoformat() if game_session.timestamp else None,
+        "player_id": game_session.player_id,
+        "player": game_session.name,
+        "dealer_hand_value": game_session.dealer_hand_value,
+        "player_hand_value": game_session.player_hand_value,
+        "outcome": game_session.outcome,
+        "bet": game_session.bet,
+        "payout": game_session.payout,
+    }
+
+
+def print_records(records: List[Dict[str, object]], output_format: str) -> None:
+    """Write records to stdout as a JSON array or as CSV with a header row, for scripts."""
+    if output_format == "json":
+        json.dump(records, sys.stdout, indent=2, default=str)
+        sys.stdout.write("\n")
+    elif output_format == "csv":
+        writer = csv.DictWriter(sys.stdout, fieldnames=list(records[0]) if records else [])
+        writer.writeheader()
+        writer.writerows(records)
+    else:
+        raise ValueError(f"Unknown output format {output_format!r}; choose from json, csv")
+
+
+def display_records(records: List[Dict[str, object]], title: str = None) -> None:
+    """Display records as a table with one column per key."""
+    table = Table(title=title, show_header=True, header_style="bold blue")
+    for column in records[0] if records else ():
+        table.add_column(column.replace("_", " ").title(), justify="right")
+    for record in records:
+        table.add_row(*(f"{value:,.3f}" if isinstance(value, float) else str(value) for value in record.values()))
+    console.print(table)
+
+
+def resolve_player_id(session, player_name: Optional[str]) -> Tuple[bool, Optional[int]]:
+    """
+    Look up the id of an optional player filter.
 
-def view_game_outcomes(session) -> None:
-    """View past game outcomes."""
-    query = (
-        session.query(
-            GameSession.player_id,
-            Player.name,
-            GameSession.dealer_hand_value,
-            GameSession.player_hand_value,
-            GameSession.outcome,
+    Returns:
+        Tuple[bool, Optional[int]]: Whether the filter can be applied, reporting an
+            unknown name when it cannot, and the player's id or None for everyone.
+    """
+    from history import find_player_id
+    if not player_name:
+        return True, None
+    player_id = find_player_id(session, player_name)
+    if player_id is None:
+        console.print(f"No player named {player_name}.", style="bold red")
+        return False, None
+    return True, player_id
+
+
+def date_range(args: argparse.Namespace) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """The [since, until) range of --since and the inclusive --until."""
+    return args.since, args.until + timedelta(days=1) if args.until else None
+
+
+def run_play(args: argparse.Namespace) -> None:
+    """Play at the table from parsed command-line arguments."""
+    configure()
+    with open_session(expire_on_commit=False) as session:
+        blackjack_game(
+            session, args.player, args.decks, args.seed, args.rounds, args.bet,
+            STRATEGIES[args.strategy] if args.strategy else None,
         )
-        .join(Player)
-    )
 
+
+def run_view(args: argparse.Namespace) -> None:
+    """Show the game history from parsed command-line arguments."""
+    since, until = date_range(args)
+    with open_session() as session:
+        if args.format == "table":
+            # paging prompts only make sense when someone is at the keyboard
+            view_game_outcomes(
+                session, args.player, since, until, interactive=sys.stdin.isatty(), limit=args.limit
+            )
+            return
+        from history import iter_game_sessions
+        found, player_id = resolve_player_id(session, args.player)
+        if not found:
+            return
+        game_sessions = itertools.islice(iter_game_sessions(session, player_id, since, until), args.limit)
+        print_records([game_session_record(game_session) for game_session in game_sessions], args.format)
+
+
+def run_stats(args: argparse.Namespace) -> None:
+    """Show per-player or per-period totals from parsed command-line arguments."""
+    from history import outcome_summary, time_buckets
+    since, until = date_range(args)
+    with open_session() as session:
+        found, player_id = resolve_player_id(session, args.player)
+        if not found:
+            return
+        if args.by:
+            records = [bucket._asdict() for bucket in time_buckets(session, args.by, player_id, since, until)]
+            if args.format == "table":
+                display_records(records, title=f"Games by {args.by}")
+            else:
+                print_records(records, args.format)
+            return
+        # streaks walk every game in range, so they are only worked out for a single player
+        with_streaks = player_id is not None
+        summaries = outcome_summary(session, player_id, since, until, with_streaks)
+        if args.format != "table":
+            print_records([summary._asdict() for summary in summaries], args.format)
+            return
+        display_outcome_summary(summaries, with_streaks)
+        from advice import AdviceStore
+        entries, hits = AdviceStore(session.get_bind()).stats()
+        if entries:
+            console.print(f"AI advice cache: {entries} situations stored, reused {hits} times.")
+
+
+def run_train(args: argparse.Namespace) -> None:
+    """Start the card counting trainer from parsed command-line arguments."""
+    import trainer
+    trainer.main(args.player, args.decks, args.rounds, args.seed, args.counts)
+
+
+def run_bench(args: argparse.Namespace) -> None:
+    """Run bench.py with the arguments that follow 'bench'."""
+    import bench
+    bench.main(args.bench_args)
+
+
+def simulation_record(result) -> Dict[str, object]:
+    """A SimulationResult as a plain dict for JSON or CSV output."""
+    return {
+        "rounds": result.rounds,
+        "wins": result.wins,
+        "losses": result.losses,
+        "ties": result.ties,
+        "blackjacks": result.blackjacks,
+        "net_units": result.net_units,
+        "house_edge": result.house_edge,
+        "hands_per_sec": result.hands_per_sec,
+    }
+
+
+def display_simulation_result(result) -> None:
+    """Display the aggregate outcome of a headless simulation."""
     table = Table(show_header=True, header_style="bold blue")
-    table.add_column("Player ID", style="dim", width=12)
-    table.add_column("Player Name", style="dim", width=20)
-    table.add_column("Dealer Hand Value", justify="right", style="dim", width=20)
-    table.add_column("Player Hand Value", justify="right", style="dim", width=20)
-    table.add_column("Outcome", justify="right", style="dim", width=15)
-
-    for game_session in query:
-        table.add_row(
-            str(game_session.player_id),
-            game_session.name,
-            str(game_session.dealer_hand_value),
-            str(game_session.player_hand_value),
-            game_session.outcome,
+    table.add_column("Rounds", justify="right")
+    table.add_column("Wins", justify="right")
+    table.add_column("Losses", justify="right")
+    table.add_column("Ties", justify="right")
+    table.add_column("Blackjacks", justify="right")
+    table.add_column("Net Units", justify="right")
+    table.add_column("House Edge", justify="right")
+    table.add_column("Hands/sec", justify="right")
+    table.add_row(
+        str(result.rounds),
+        str(result.wins),
+        str(result.losses),
+        str(result.ties),
+        str(result.blackjacks),
+        f"{result.net_units:.1f}",
+        f"{result.house_edge:.3%}",
+        f"{result.hands_per_sec:,.0f}",
+    )
+    console.print(table)
+
+
+def run_simulation(args: argparse.Namespace) -> None:
+    """Run the headless simulator from parsed command-line arguments."""
+    rules = Rules(num_decks=args.decks)
+    if args.record:
+        record_simulated_sessions(args, rules)
+        return
+    if args.engine == "numpy":
+        # NumPy is only needed for this engine, so it is imported on demand
+        from vector_sim import simulate_vectorized
+        result = simulate_vectorized(args.rounds, STRATEGIES[args.strategy], rules, seed=args.seed)
+    else:
+        result = simulate_parallel(
+            args.rounds, STRATEGIES[args.strategy], rules, seed=args.seed, workers=args.workers
         )
+    if args.format == "table":
+        display_simulation_result(result)
+    else:
+        print_records([simulation_record(result)], args.format)
+
+
+def record_simulated_sessions(args: argparse.Namespace, rules: Rules) -> None:
+    """Simulate in this process and store every round as a game session of args.record."""
+    # only needed when recording, so imported on demand
+    from ingest import record_simulation
+    with open_session() as session:
+        engine = session.get_bind()
+        player_id = get_or_create_player(session, args.record).id
+    stats = record_simulation(
+        engine, player_id, args.rounds, STRATEGIES[args.strategy], rules, args.seed, args.batch_size
+    )
+    console.print(
+        f"Recorded {stats['rows']:,} game sessions for {args.record} in {stats['seconds']:.2f}s "
+        f"({stats['rows_per_sec']:,.0f} rows/sec)."
+    )
+
 
+def run_counting_simulation(args: argparse.Namespace) -> None:
+    """Run the hi-lo bet-ramp simulator from parsed command-line arguments."""
+    rules = Rules(num_decks=args.decks, penetration=args.penetration)
+    result = simulate_counting_parallel(
+        args.shoes, parse_ramp(args.ramp), rules, args.unit, args.bankroll,
+        seed=args.seed, workers=args.workers,
+    )
+    table = Table(show_header=True, header_style="bold blue")
+    table.add_column("Shoes", justify="right")
+    table.add_column("Rounds", justify="right")
+    table.add_column("Win Rate ($/round)", justify="right")
+    table.add_column("Std Dev ($/round)", justify="right")
+    table.add_column("Player Edge", justify="right")
+    table.add_column("Risk of Ruin", justify="right")
+    table.add_column("N0 (rounds)", justify="right")
+    table.add_column("Hands/sec", justify="right")
+    table.add_row(
+        str(result.shoes),
+        str(result.rounds),
+        f"{result.win_rate:+.4f}",
+        f"{result.standard_deviation:.3f}",
+        f"{result.player_edge:+.3%}",
+        f"{result.risk_of_ruin(args.bankroll):.2%}",
+        f"{result.n0:,.0f}",
+        f"{result.hands_per_sec:,.0f}",
+    )
     console.print(table)
 
 
-def main() -> None:
-    """Main program entry point."""
-    configure()
-    db_url = "sqlite:///blackjack.db"
-    engine = get_db_engine(db_url)
-    init_db(engine)
-    Session = sessionmaker(bind=engine)
+def run_replay(args: argparse.Namespace) -> None:
+    """Replay recorded game sessions headlessly and report any that do not match their record."""
+    # only needed for auditing, so imported on demand
+    from replay import replay_history
+    with open_session() as session:
+        found, player_id = resolve_player_id(session, args.player)
+        if not found:
+            return
+        report = replay_history(session, player_id)
+
+    table = Table(show_header=True, header_style="bold blue")
+    table.add_column("Replayed", justify="right")
+    table.add_column("Verified", justify="right")
+    table.add_column("Mismatched", justify="right")
+    table.add_column("Skipped", justify="right")
+    table.add_column("Recorded Net", justify="right")
+    table.add_column("Replayed Net", justify="right")
+    table.add_row(
+        str(report.sessions),
+        str(report.verified),
+        str(report.mismatched),
+        str(report.skipped),
+        f"{report.recorded_net:+g}",
+        f"{report.replayed_net:+g}",
+    )
+    console.print(table)
+    console.print(f"Replayed in {report.elapsed:.2f}s ({report.sessions_per_sec:,.0f} sessions/sec).")
+
+    if report.mismatches:
+        table = Table(title="Mismatches", show_header=True, header_style="bold red")
+        table.add_column("Session", justify="right")
+        table.add_column("Field")
+        table.add_column("Recorded")
+        table.add_column("Replayed")
+        for mismatch in report.mismatches[:args.show]:
+            table.add_row(str(mismatch.session_id), mismatch.field, str(mismatch.recorded), str(mismatch.replayed))
+        console.print(table)
+
+
+def profile_startup(top: int = 15) -> None:
+    """
+    Time a cold start in a fresh interpreter and show the slowest imports.
+
+    The game module is imported with python -X importtime, whose report is summed per
+    top-level package; the wall-clock time of the run is about the time to the menu.
+    """
+    command = [sys.executable, "-X", "importtime", "-c", "import blackjack"]
+    start = time.perf_counter()
+    completed = subprocess.run(
+        command, cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True
+    )
+    elapsed = time.perf_counter() - start
+
+    # lines look like "import time:   self [us] | cumulative | <indent>package.module"
+    packages: Dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        package = fields[2].strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(fields[0].split(":")[1])
 
-    with Session() as session:
+    table = Table(title="Startup imports", show_header=True, header_style="bold blue")
+    table.add_column("Package")
+    table.add_column("ms", justify="right")
+    table.add_column("Share", justify="right")
+    total = sum(packages.values())
+    for package, microseconds in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        table.add_row(package, f"{microseconds / 1000:.1f}", f"{microseconds / total:.0%}")
+    console.print(table)
+    console.print(
+        f"Imports: {total / 1000:.0f} ms of a {elapsed * 1000:.0f} ms cold start (interpreter included)."
+    )
+
+
+def add_format_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "-f", "--format", choices=OUTPUT_FORMATS, default="table",
+        help="A table for people, or JSON or CSV on stdout for scripts",
+    )
+
+
+def add_history_filter_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("-p", "--player", default=None, help="Only this player's games (defaults to everyone)")
+    parser.add_argument("--since", type=parse_date, default=None, help="First day to include, YYYY-MM-DD")
+    parser.add_argument("--until", type=parse_date, default=None, help="Last day to include, YYYY-MM-DD")
+
+
+def positive_int(text: str) -> int:
+    """An argparse type for amounts of at least 1."""
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not at least 1")
+    return value
+
+
+def penetration_fraction(text: str) -> float:
+    """An argparse type for a fraction of the shoe above 0 and at most 1."""
+    value = float(text)
+    if not 0 < value <= 1:
+        raise argparse.ArgumentTypeError(f"{value} is not a fraction above 0 and at most 1")
+    return value
+
+
+def parse_counts(text: str) -> List[int]:
+    """An argparse type for a comma-separated list of running counts."""
+    try:
+        return [int(count) for count in text.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{text!r} is not a comma-separated list of whole numbers")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse the command line; with no subcommand the interactive menu is started."""
+    parser = argparse.ArgumentParser(description="CLI Blackjack")
+    parser.add_argument(
+        "--profile-startup", action="store_true",
+        help="Time a cold start of the game and show where the import time goes",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    play_parser = subparsers.add_parser("play", help="Play at the table")
+    play_parser.add_argument("-p", "--player", default=None, help="Player name (asked for when omitted)")
+    play_parser.add_argument("-d", "--decks", type=int, choices=range(1, 9), default=HOUSE_RULES.num_decks, help="Number of decks in the shoe")
+    play_parser.add_argument("--seed", type=int, default=None, help="Seed for the shoe, to deal the same game again")
+    play_parser.add_argument(
+        "-n", "--rounds", type=positive_int, default=None, help="Rounds to play (asks after each round when omitted)"
+    )
+    play_parser.add_argument("-b", "--bet", type=positive_int, default=None, help="Bet this amount every round")
+    play_parser.add_argument(
+        "-s", "--strategy", choices=sorted(STRATEGIES), default=None, help="Hit or stand with this strategy"
+    )
+
+    view_parser = subparsers.add_parser("view", help="Show past games, newest first")
+    add_history_filter_arguments(view_parser)
+    view_parser.add_argument("-n", "--limit", type=positive_int, default=None, help="Show at most this many games")
+    add_format_argument(view_parser)
+
+    stats_parser = subparsers.add_parser("stats", help="Show win/loss totals per player or per period")
+    add_history_filter_arguments(stats_parser)
+    stats_parser.add_argument(
+        "--by", choices=BUCKET_PERIODS, default=None, help="Total the games per period instead of per player"
+    )
+    add_format_argument(stats_parser)
+
+    train_parser = subparsers.add_parser("train", help="Practice the hi-lo count")
+    train_parser.add_argument("-p", "--player", default=None, help="Player name (asked for when omitted)")
+    train_parser.add_argument("-d", "--decks", type=int, choices=range(1, 9), default=None, help="Number of decks (asked for when omitted)")
+    train_parser.add_argument(
+        "-n", "--rounds", type=positive_int, default=None, help="Rounds to play (asks after each round when omitted)"
+    )
+    train_parser.add_argument("--seed", type=int, default=None, help="Seed for the shoe")
+    train_parser.add_argument(
+        "--counts", type=parse_counts, default=None,
+        help="Comma-separated answers to the running count questions, one per round, e.g. 2,-1,0",
+    )
+
+    bench_parser = subparsers.add_parser("bench", help="Run the benchmarks in bench.py", add_help=False)
+    bench_parser.add_argument("bench_args", nargs=argparse.REMAINDER, help="Arguments for bench.py")
+
+    simulate_parser = subparsers.add_parser("simulate", help="Simulate rounds headlessly")
+    simulate_parser.add_argument("-n", "--rounds", type=positive_int, default=100000, help="Number of rounds to play")
+    simulate_parser.add_argument(
+        "-s", "--strategy", choices=sorted(STRATEGIES), default="mimic-dealer", help="Player strategy"
+    )
+    simulate_parser.add_argument("-d", "--decks", type=int, choices=range(1, 9), default=1, help="Number of decks in the shoe")
+    simulate_parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible runs")
+    simulate_parser.add_argument(
+        "-w", "--workers", type=positive_int, default=None, help="Worker processes (defaults to all cores)"
+    )
+    simulate_parser.add_argument(
+        "-e", "--engine", choices=["python", "numpy"], default="python",
+        help="Round-by-round process pool, or vectorized NumPy batches (fresh shoe every round)"
+    )
+    simulate_parser.add_argument(
+        "--record", metavar="PLAYER", default=None,
+        help="Store every simulated round in the database as a game session of this player",
+    )
+    simulate_parser.add_argument(
+        "--batch-size", type=positive_int, default=10000, help="Rows per insert batch when recording"
+    )
+    add_format_argument(simulate_parser)
+
+    count_parser = subparsers.add_parser(
+        "simulate-count", help="Measure hi-lo counting with a bet ramp over many shoes"
+    )
+    count_parser.add_argument("-n", "--shoes", type=positive_int, default=10000, help="Number of shoes to play")
+    count_parser.add_argument("-d", "--decks", type=int, choices=range(1, 9), default=6, help="Number of decks in the shoe")
+    count_parser.add_argument("-p", "--penetration", type=penetration_fraction, default=0.75, help="Fraction dealt before the cut card")
+    count_parser.add_argument(
+        "-r", "--ramp", default=",".join(f"{tc}:{units}" for tc, units in DEFAULT_RAMP),
+        help="Bet ramp as true_count:units pairs",
+    )
+    count_parser.add_argument("-u", "--unit", type=float, default=5, help="Dollars per betting unit")
+    count_parser.add_argument("-b", "--bankroll", type=float, default=100, help="Bankroll, which also sets the table limit")
+    count_parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible runs")
+    count_parser.add_argument(
+        "-w", "--workers", type=positive_int, default=None, help="Worker processes (defaults to all cores)"
+    )
+
+    replay_parser = subparsers.add_parser(
+        "replay", help="Replay recorded game sessions and verify their outcomes and payouts"
+    )
+    replay_parser.add_argument(
+        "-p", "--player", default=None, help="Only replay this player's games (defaults to the whole database)"
+    )
+    replay_parser.add_argument("--show", type=int, default=20, help="Mismatches to list")
+
+    args = parser.parse_args(argv)
+    if args.command == "play" and args.bet is not None and args.strategy and args.rounds is None:
+        play_parser.error("--rounds is required when --bet and --strategy play every round")
+    if args.command == "train" and args.counts and args.rounds is not None and args.rounds > len(args.counts):
+        train_parser.error(f"--counts answers {len(args.counts)} rounds, fewer than --rounds")
+    return args
+
+
+def run_menu() -> None:
+    """The interactive menu started when no subcommand is given."""
+    configure()
+    # the database is opened by the first play or view rather than before the menu
+    session = None
+    try:
         while True:
             action = get_user_input(
                 "Enter 'play' to start a new game, 'view' to view past outcomes, or 'quit' to exit: "
             )
+            if action in ("play", "view") and session is None:
+                # the Player row stays loaded between rounds instead of being re-read after every commit
+                session = open_session(expire_on_commit=False)
             if action == "play":
                 blackjack_game(session)
             elif action == "view":
-                view_game_outcomes(session)
+                view_game_outcomes(session, *prompt_view_filters())
             elif action == "quit":
                 console.print("Goodbye!")
-                os.system("clear")
+                console.clear()
                 break
             else:
                 console.print("Invalid input. Please try again.", style="bold red")
+    finally:
+        if session is not None:
+            session.close()
+
+
+def main(argv=None) -> None:
+    """Main program entry point."""
+    args = parse_args(argv)
+    commands = {
+        "play": run_play,
+        "view": run_view,
+        "stats": run_stats,
+        "train": run_train,
+        "bench": run_bench,
+        "simulate": run_simulation,
+        "simulate-count": run_counting_simulation,
+        "replay": run_replay,
+    }
+    try:
+        if args.command:
+            commands[args.command](args)
+        elif args.profile_startup:
+            profile_startup()
+        else:
+            run_menu()
+    except EOFError:
+        # stdin closed while a question was waiting, e.g. a script with too few answers
+        console.print("\nInput ended.", style="bold red")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,44 @@
+# compact integer encoding of playing cards
+#
+# A card is a small int in 0..51: suit index * 13 + rank index, following the order of
+# SUITS and RANKS in config.py. A shoe is an array('B') holding one byte per card, and
+# everything the rules need about a card is read from the precomputed tables below.
+from array import array
+from typing import Iterable
+
+from config import RANKS, SUITS, VALUES
+
+CARDS_PER_DECK = len(SUITS) * len(RANKS)
+
+# rank index (0 = Ace .. 12 = King) of every card code
+CARD_RANKS = bytes(code % len(RANKS) for code in range(CARDS_PER_DECK))
+
+# blackjack value of every card code, with an Ace counted as 11
+CARD_VALUES = bytes(VALUES[RANKS[rank]] for rank in CARD_RANKS)
+
+# 1 for every Ace, 0 otherwise, so aces can be summed without branching
+IS_ACE = bytes(rank == 0 for rank in CARD_RANKS)
+
+# hi-lo tag of every card code: +1 for 2-6, 0 for 7-9, -1 for tens and Aces
+HI_LO_TAGS = tuple(1 if 2 <= value <= 6 else -1 if value >= 10 else 0 for value in CARD_VALUES)
+
+# display name of every card code, matching the keys of ascii.deck_of_cards
+CARD_NAMES = tuple(f"{RANKS[code % len(RANKS)]} of {SUITS[code // len(RANKS)]}" for code in range(CARDS_PER_DECK))
+
+
+def new_shoe(num_decks: int = 1) -> array:
+    """Build an unshuffled shoe of card codes, one byte per card."""
+    return array("B", range(CARDS_PER_DECK)) * num_decks
+
+
+def hand_value(hand: Iterable[int]) -> int:
+    """Calculate the blackjack value of a hand of card codes."""
+    value = 0
+    aces = 0
+    for code in hand:
+        value += CARD_VALUES[code]
+        aces += IS_ACE[code]
+    while value > 21 and aces:
+        value -= 10
+        aces -= 1
+    return value
@@ -20,6 +20,35 @@ VALUES = {
     'King': 10
 }
 
+# House rules shared by the interactive game and the headless simulator.
+DEALER_STANDS_ON = 17       # dealer hits below this total
+BLACKJACK_PAYOUT = 2.5      # amount returned per unit bet on a natural
+WIN_PAYOUT = 2              # amount returned per unit bet on a win
+PUSH_PAYOUT = 1             # amount returned per unit bet on a tie
+
+# Audio backend: "pygame", "null" or "recording"; the BLACKJACK_AUDIO env var overrides it.
+AUDIO_BACKEND = "pygame"
+
+# Database: where the game keeps players and history, and the engine profile used to open
+# it ("default", "performance" or "memory", see models.get_db_engine); the BLACKJACK_DB_URL
+# and BLACKJACK_DB_PROFILE env vars override them.
+DB_URL = "sqlite:///blackjack.db"
+DB_PROFILE = "performance"
+
+# "help" (see ev_solver.py): how many of the cards the player may still draw are taken out
+# of the shoe the dealer draws from; 0 is instant, each level about 10x slower and a little
+# more exact. The BLACKJACK_HELP_DEPTH env var overrides it.
+HELP_EXACT_DEPTH = 0
+
+# AI advice (see advice.py): seconds "help" waits for the API before answering from the
+# local strategy, seconds a single API request may take, how long and for how many game
+# states answers are cached in memory, and how long they are kept in the database.
+ADVICE_TIMEOUT = 2.0
+ADVICE_REQUEST_TIMEOUT = 10.0
+ADVICE_CACHE_TTL = 3600
+ADVICE_CACHE_SIZE = 256
+ADVICE_STORE_TTL = 30 * 24 * 3600
+
 
 # Instructions for introduction to game play.
 
@@ -0,0 +1,222 @@
+# offline simulator that measures whether hi-lo counting with a bet ramp wins money
+import math
+import os
+import random
+import time
+from multiprocessing import Pool
+from typing import Optional, Tuple
+
+from cards import CARD_VALUES, HI_LO_TAGS
+from rules import HOUSE_RULES, Rules, max_table_bet
+from shoe import Shoe
+from simulator import Strategy, play_round, shard_seeds
+from strategy import basic_strategy
+
+# (minimum true count, bet in units) steps, lowest first; below the first step the
+# first bet applies
+BetRamp = Tuple[Tuple[int, int], ...]
+DEFAULT_RAMP: BetRamp = ((1, 1), (2, 2), (3, 4), (4, 6), (5, 8))
+
+
+def parse_ramp(text: str) -> BetRamp:
+    """Parse a ramp written as "true_count:units" pairs, e.g. "1:1,2:2,3:4"."""
+    steps = []
+    for step in text.split(","):
+        true_count, units = step.split(":")
+        steps.append((int(true_count), int(units)))
+    return tuple(sorted(steps))
+
+
+def ramp_units(ramp: BetRamp, true_count: float) -> int:
+    """Bet size in units for a true count (floored, as players do at the table)."""
+    floored = math.floor(true_count)
+    units = ramp[0][1]
+    for minimum, step_units in ramp:
+        if floored < minimum:
+            break
+        units = step_units
+    return units
+
+
+class CountingResult:
+    """
+    Streaming totals of a bet-ramp simulation, in dollars.
+
+    Only sums are kept, so results from many workers merge by addition and the
+    parent never sees individual hands.
+    """
+
+    def __init__(self, rounds=0, shoes=0, wagered=0.0, net=0.0, net_squared=0.0, elapsed=0.0):
+        self.rounds = rounds
+        self.shoes = shoes
+        self.wagered = wagered
+        self.net = net
+        self.net_squared = net_squared
+        self.elapsed = elapsed
+
+    def merge(self, other: "CountingResult") -> "CountingResult":
+        """Fold another batch of totals into this one, in place, and return self."""
+        self.rounds += other.rounds
+        self.shoes += other.shoes
+        self.wagered += other.wagered
+        self.net += other.net
+        self.net_squared += other.net_squared
+        self.elapsed += other.elapsed
+        return self
+
+    @property
+    def win_rate(self) -> float:
+        """Expected dollars won per round."""
+        return self.net / self.rounds if self.rounds else 0.0
+
+    @property
+    def standard_deviation(self) -> float:
+        """Standard deviation of the dollars won per round."""
+        if self.rounds < 2:
+            return 0.0
+        variance = (self.net_squared - self.net * self.net / self.rounds) / (self.rounds - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    @property
+    def player_edge(self) -> float:
+        """Dollars won per dollar wagered."""
+        return self.net / self.wagered if self.wagered else 0.0
+
+    @property
+    def n0(self) -> float:
+        """Rounds needed before the expected win equals one standard deviation."""
+        if self.win_rate <= 0:
+            return math.inf
+        return (self.standard_deviation / self.win_rate) ** 2
+
+    def risk_of_ruin(self, bankroll: float) -> float:
+        """Chance of losing the whole bankroll, from the diffusion approximation."""
+        if self.win_rate <= 0:
+            return 1.0
+        variance = self.standard_deviation ** 2
+        return math.exp(-2 * self.win_rate * bankroll / variance) if variance else 0.0
+
+    @property
+    def hands_per_sec(self) -> float:
+        return self.rounds / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return (f"<CountingResult(shoes={self.shoes}, rounds={self.rounds}, "
+                f"win_rate={self.win_rate:.4f}, sd={self.standard_deviation:.3f}, "
+                f"edge={self.player_edge:.4%}, n0={self.n0:.0f})>")
+
+
+def simulate_counting(
+    n_shoes: int,
+    ramp: BetRamp = DEFAULT_RAMP,
+    rules: Rules = HOUSE_RULES,
+    unit: float = 5,
+    bankroll: float = 100,
+    strategy: Strategy = basic_strategy,
+    seed: Optional[int] = None,
+) -> CountingResult:
+    """
+    Play whole shoes, sizing every bet from the hi-lo true count.
+
+    The running count sees every card dealt (the dealer's hole card is counted as it is
+    drawn; it is always revealed before the next bet) and starts over on each reshuffle,
+    including the one deal() makes when a shoe dealt to the last card (penetration 1)
+    runs out mid-round.
+    The bet is the ramp's units times unit, capped by the table limit for bankroll
+    (see rules.max_table_bet, the tiers used by betting.table_bets).
+
+    Args:
+        n_shoes (int): Number of shoes to play to the cut card.
+        ramp (BetRamp, optional): True count to bet units steps.
+        rules (Rules, optional): The table rules, including decks and penetration.
+        unit (float, optional): Dollars per betting unit.
+        bankroll (float, optional): Money bag that sets the table limit.
+        strategy (Strategy, optional): The player's hit/stand policy.
+        seed (int, optional): Seed for reproducible runs.
+
+    Returns:
+        CountingResult: Streaming totals in dollars.
+    """
+    shoe = Shoe(rules.num_decks, rules.penetration, random.Random(seed))
+    deal = shoe.deal
+    max_bet = max_table_bet(bankroll)
+    running_count = 0
+    shoes = 0
+
+    def new_shoe() -> None:
+        # also called when a shoe dealt to the last card runs out mid-round
+        nonlocal running_count, shoes
+        running_count = 0
+        shoes += 1
+
+    shoe.add_reshuffle_listener(new_shoe)
+
+    def draw() -> int:
+        nonlocal running_count
+        card = deal()
+        running_count += HI_LO_TAGS[card]
+        return CARD_VALUES[card]
+
+    result = CountingResult()
+    start = time.perf_counter()
+    while True:
+        if shoe.needs_reshuffle or not shoes:
+            if shoes >= n_shoes:
+                break
+            shoe.shuffle()
+        true_count = running_count / shoe.remaining_decks
+        bet = min(ramp_units(ramp, true_count) * unit, max_bet)
+        payout, _, _, _ = play_round(draw, strategy, rules)
+        net = (payout - 1) * bet
+        result.rounds += 1
+        result.wagered += bet
+        result.net += net
+        result.net_squared += net * net
+        if shoes > n_shoes:
+            # the last shoe ran out mid-round and the round finished in a fresh one
+            break
+    result.shoes = min(shoes, n_shoes)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def _run_shard(args) -> CountingResult:
+    return simulate_counting(*args)
+
+
+def simulate_counting_parallel(
+    n_shoes: int,
+    ramp: BetRamp = DEFAULT_RAMP,
+    rules: Rules = HOUSE_RULES,
+    unit: float = 5,
+    bankroll: float = 100,
+    strategy: Strategy = basic_strategy,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> CountingResult:
+    """
+    Run simulate_counting across a process pool, one shard of shoes per worker.
+
+    Shards are seeded from the master seed like simulator.simulate_parallel, and each
+    returns only its streaming totals.
+
+    Returns:
+        CountingResult: The merged totals; elapsed is the wall-clock time of the run.
+    """
+    workers = workers or os.cpu_count() or 1
+    base, extra = divmod(n_shoes, workers)
+    shards = [
+        (base + (i < extra), ramp, rules, unit, bankroll, strategy, shard_seed)
+        for i, shard_seed in enumerate(shard_seeds(seed, workers))
+    ]
+
+    result = CountingResult()
+    start = time.perf_counter()
+    if workers == 1:
+        result.merge(_run_shard(shards[0]))
+    else:
+        with Pool(workers) as pool:
+            for shard_result in pool.imap_unordered(_run_shard, shards):
+                result.merge(shard_result)
+    result.elapsed = time.perf_counter() - start
+    return result
@@ -0,0 +1,103 @@
+# exact distribution of the dealer's final total for a known shoe composition
+#
+# A shoe composition is a tuple of ten counts indexed by card value - 2, so index 0
+# holds the 2s, index 8 every ten-valued card and index 9 the Aces. The dealer's
+# draw-to-17 is expanded as a memoized recursion over those counts, with no sampling.
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, Tuple
+
+from cards import CARD_VALUES
+from config import DEALER_STANDS_ON, RANKS, SUITS, VALUES
+
+Composition = Tuple[int, ...]
+CARD_VALUE_ORDER = tuple(range(2, 12))
+BUST = 22
+
+
+def full_composition(num_decks: int = 1) -> Composition:
+    """Composition of a fresh shoe of num_decks standard decks."""
+    per_deck = Counter(VALUES[rank] for rank in RANKS)
+    return tuple(per_deck[value] * len(SUITS) * num_decks for value in CARD_VALUE_ORDER)
+
+
+def composition_of(cards: Iterable[int]) -> Composition:
+    """Composition of an iterable of card codes, e.g. the cards left in a shoe."""
+    counts = [0] * len(CARD_VALUE_ORDER)
+    for card in cards:
+        counts[CARD_VALUES[card] - 2] += 1
+    return tuple(counts)
+
+
+def remove_card(composition: Composition, value: int) -> Composition:
+    """Composition with one card of the given value taken out."""
+    index = value - 2
+    if not composition[index]:
+        raise ValueError(f"No card of value {value} left in the shoe")
+    return composition[:index] + (composition[index] - 1,) + composition[index + 1:]
+
+
+@lru_cache(maxsize=1 << 20)
+def _finish(total: int, soft: bool, composition: Composition, stands_on: int) -> Tuple[float, ...]:
+    """Probability of each final total from stands_on to 21, then of a bust, from a dealer state."""
+    remaining = sum(composition)
+    if total >= stands_on or not remaining:
+        # a shoe that runs dry leaves the dealer standing; the game reshuffles long before
+        outcome = [0.0] * (BUST - stands_on + 1)
+        outcome[max(total - stands_on, 0)] = 1.0
+        return tuple(outcome)
+    outcome = None
+    bust = 0.0
+    for index, count in enumerate(composition):
+        if not count:
+            continue
+        value = index + 2
+        new_total = total + (1 if value == 11 and soft else value)
+        new_soft = soft or value == 11
+        if new_total > 21 and new_soft:
+            new_total -= 10
+            new_soft = False
+        probability = count / remaining
+        if new_total > 21:
+            bust += probability
+            continue
+        reduced = composition[:index] + (count - 1,) + composition[index + 1:]
+        child = _finish(new_total, new_soft, reduced, stands_on)
+        if outcome is None:
+            outcome = [probability * final_probability for final_probability in child]
+        else:
+            outcome = [current + probability * final_probability
+                       for current, final_probability in zip(outcome, child)]
+    if outcome is None:
+        outcome = [0.0] * (BUST - stands_on + 1)
+    outcome[-1] += bust
+    return tuple(outcome)
+
+
+@lru_cache(maxsize=4096)
+def dealer_outcome_probabilities(
+    upcard: int, composition: Composition, stands_on: int = DEALER_STANDS_ON
+) -> Dict[int, float]:
+    """
+    Exact distribution of the dealer's final total.
+
+    The hole card has not been seen, so it is drawn from the composition like every
+    other dealer card. Results are cached per (upcard, composition) key with LRU eviction,
+    which makes repeated queries after every dealt card cheap.
+
+    Args:
+        upcard (int): Value of the dealer's upcard (Ace is 11).
+        composition (Composition): Counts of the unseen cards, upcard already removed.
+        stands_on (int, optional): The dealer hits any total below this value.
+
+    Returns:
+        Dict[int, float]: Final totals mapped to their probability; 22 stands for a bust.
+    """
+    distribution = _finish(upcard, upcard == 11, composition, stands_on)
+    return {stands_on + offset: probability for offset, probability in enumerate(distribution) if probability}
+
+
+def clear_cache() -> None:
+    """Drop every memoized dealer state, e.g. when the shoe is reshuffled."""
+    _finish.cache_clear()
+    dealer_outcome_probabilities.cache_clear()
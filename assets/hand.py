@@ -0,0 +1,62 @@
+# a blackjack hand that keeps its value up to date as cards are added
+from typing import Iterable, Iterator
+
+from cards import CARD_VALUES, IS_ACE
+
+
+class Hand:
+    """
+    A hand of card codes whose value is maintained incrementally.
+
+    add_card updates the running total, the number of Aces still counted as 11 and the
+    bust/blackjack flags, so reading any of them is O(1) no matter how many cards the
+    hand holds.
+
+    Attributes:
+        cards (list): The card codes in the order they were dealt.
+        value (int): The best blackjack total of the hand.
+        soft_aces (int): How many Aces are currently counted as 11.
+        is_bust (bool): Whether the value is over 21.
+        is_blackjack (bool): Whether the hand is a two-card 21.
+    """
+    __slots__ = ("cards", "value", "soft_aces", "is_bust", "is_blackjack")
+
+    def __init__(self, cards: Iterable[int] = ()):
+        self.cards = []
+        self.value = 0
+        self.soft_aces = 0
+        self.is_bust = False
+        self.is_blackjack = False
+        for card in cards:
+            self.add_card(card)
+
+    def add_card(self, card: int) -> None:
+        """Add a card code to the hand and update its value and flags."""
+        self.cards.append(card)
+        value = self.value + CARD_VALUES[card]
+        soft_aces = self.soft_aces + IS_ACE[card]
+        while value > 21 and soft_aces:
+            value -= 10
+            soft_aces -= 1
+        self.value = value
+        self.soft_aces = soft_aces
+        self.is_bust = value > 21
+        self.is_blackjack = value == 21 and len(self.cards) == 2
+
+    @property
+    def is_soft(self) -> bool:
+        """Whether an Ace is being counted as 11."""
+        return self.soft_aces > 0
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.cards)
+
+    def __getitem__(self, index):
+        return self.cards[index]
+
+    def __repr__(self):
+        return (f"<Hand(cards={self.cards}, value={self.value}, "
+                f"soft={self.is_soft}, bust={self.is_bust}, blackjack={self.is_blackjack})>")
@@ -0,0 +1,77 @@
+# compact binary record of the cards and actions of one round
+#
+# A record is a few bytes: the number of player cards, the player's card codes, the
+# number of dealer cards, the dealer's card codes, then one byte per action taken.
+# Card codes are the 0..51 ints of cards.py, so a typical round fits in about ten bytes.
+from typing import Iterable, List, Optional, Tuple
+
+ACTIONS = ("stand", "hit", "help")
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+
+def encode_hand_record(player_cards: Iterable[int], dealer_cards: Iterable[int], actions: Iterable[str] = ()) -> bytes:
+    """
+    Pack the cards and actions of a round into bytes.
+
+    Args:
+        player_cards (iterable): The player's card codes in the order dealt.
+        dealer_cards (iterable): The dealer's card codes in the order dealt.
+        actions (iterable, optional): The actions the player took, each one of ACTIONS.
+
+    Returns:
+        bytes: The packed record, see HandRecord for the layout.
+    """
+    player_cards = bytes(player_cards)
+    dealer_cards = bytes(dealer_cards)
+    return (
+        bytes((len(player_cards),)) + player_cards
+        + bytes((len(dealer_cards),)) + dealer_cards
+        + bytes(ACTION_CODES[action] for action in actions)
+    )
+
+
+class HandRecord:
+    """
+    A packed round record that is only unpacked when one of its parts is read.
+
+    Attributes:
+        data (bytes): The packed record from encode_hand_record.
+    """
+    __slots__ = ("data", "_parts")
+
+    def __init__(self, data: bytes):
+        self.data = bytes(data)
+        self._parts: Optional[Tuple[List[int], List[int], List[str]]] = None
+
+    def _unpack(self) -> Tuple[List[int], List[int], List[str]]:
+        if self._parts is None:
+            data = self.data
+            n_player = data[0]
+            dealer_start = 1 + n_player
+            n_dealer = data[dealer_start]
+            actions_start = dealer_start + 1 + n_dealer
+            self._parts = (
+                list(data[1:dealer_start]),
+                list(data[dealer_start + 1:actions_start]),
+                [ACTIONS[code] for code in data[actions_start:]],
+            )
+        return self._parts
+
+    @property
+    def player_cards(self) -> List[int]:
+        return self._unpack()[0]
+
+    @property
+    def dealer_cards(self) -> List[int]:
+        return self._unpack()[1]
+
+    @property
+    def actions(self) -> List[str]:
+        return self._unpack()[2]
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self):
+        return (f"<HandRecord(player_cards={self.player_cards}, dealer_cards={self.dealer_cards}, "
+                f"actions={self.actions})>")
@@ -0,0 +1,241 @@
+# aggregate queries and paging over the game_sessions history
+#
+# Everything here is computed by the database: counts and net results with GROUP BY,
+# streaks with window functions, and pages with keyset pagination on the primary key,
+# so the cost of viewing the history does not grow with the number of rows shown.
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import case, func
+
+from models import GameSession, Player
+
+# strftime formats of the time buckets supported by time_buckets (SQLite)
+BUCKET_FORMATS = {
+    "hour": "%Y-%m-%d %H:00",
+    "day": "%Y-%m-%d",
+    "week": "%Y-W%W",
+    "month": "%Y-%m",
+}
+
+
+class PlayerSummary(NamedTuple):
+    """
+    Totals of one player's games.
+
+    net_hands is hands won minus hands lost; net_money is payouts minus bets, over the
+    games recorded with a bet.
+    """
+    player_id: int
+    name: str
+    games: int
+    wins: int
+    losses: int
+    ties: int
+    net_hands: int
+    net_money: float
+    longest_win_streak: int = 0
+    longest_loss_streak: int = 0
+    current_streak: str = ""
+
+
+class BucketSummary(NamedTuple):
+    """Totals of the games played in one time bucket, net_hands and net_money as in PlayerSummary."""
+    bucket: str
+    games: int
+    wins: int
+    losses: int
+    ties: int
+    net_hands: int
+    net_money: float
+
+
+def _filtered(query, player_id: Optional[int] = None, since: Optional[datetime] = None,
+              until: Optional[datetime] = None):
+    """Restrict a game_sessions query to one player and a [since, until) time range."""
+    if player_id is not None:
+        query = query.filter(GameSession.player_id == player_id)
+    if since is not None:
+        query = query.filter(GameSession.timestamp >= since)
+    if until is not None:
+        query = query.filter(GameSession.timestamp < until)
+    return query
+
+
+def _outcome_counts():
+    """Column expressions counting games, wins, losses and ties, and the net hands and money."""
+    wins = func.sum(case((GameSession.outcome == "Win", 1), else_=0))
+    losses = func.sum(case((GameSession.outcome == "Loss", 1), else_=0))
+    ties = func.sum(case((GameSession.outcome == "Tie", 1), else_=0))
+    # games recorded without a bet have a NULL difference, which SUM skips
+    net_money = func.coalesce(func.sum(GameSession.payout - GameSession.bet), 0)
+    return func.count(GameSession.id), wins, losses, ties, wins - losses, net_money
+
+
+def _totals(row) -> tuple:
+    """The counts and net hands of an _outcome_counts row as ints, then the net money as a float."""
+    return (*(int(value or 0) for value in row[:5]), float(row[5] or 0))
+
+
+def outcome_summary(session, player_id: Optional[int] = None, since: Optional[datetime] = None,
+                    until: Optional[datetime] = None, with_streaks: bool = True) -> List[PlayerSummary]:
+    """
+    Per-player win/loss/tie counts, net hands and money, and streaks.
+
+    The counts are grouped in player_id index order, with each game's bet and payout
+    read from the table for the net money. Streaks need window functions over every
+    game in range, several times slower, so they can be skipped.
+
+    Args:
+        session: The SQLAlchemy database session.
+        player_id (int, optional): Only summarize this player.
+        since (datetime, optional): Only count games played at or after this time.
+        until (datetime, optional): Only count games played before this time.
+        with_streaks (bool, optional): Also compute the streaks; left at zero otherwise.
+
+    Returns:
+        List[PlayerSummary]: One summary per player with games in range, by player id.
+    """
+    # grouped without the players join so the games are walked in player_id index order
+    query = _filtered(
+        session.query(GameSession.player_id, *_outcome_counts()), player_id, since, until,
+    ).group_by(GameSession.player_id).order_by(GameSession.player_id)
+    rows = query.all()
+    names = dict(session.query(Player.id, Player.name).filter(Player.id.in_([row[0] for row in rows])))
+    streaks = streak_summary(session, player_id, since, until) if with_streaks else {}
+    return [
+        PlayerSummary(row[0], names.get(row[0], ""), *_totals(row[1:]),
+                      *streaks.get(row[0], (0, 0, "")))
+        for row in rows
+    ]
+
+
+def streak_summary(session, player_id: Optional[int] = None, since: Optional[datetime] = None,
+                   until: Optional[datetime] = None) -> Dict[int, Tuple[int, int, str]]:
+    """
+    Longest win streak, longest loss streak and current streak of every player.
+
+    Consecutive games with the same outcome form a run. Each game is flagged when its
+    outcome differs from the player's previous game (LAG), a running SUM of the flags
+    numbers the runs, and the runs are measured with GROUP BY. The games are read in
+    player and id order straight from the player_id index, and none is read into Python.
+
+    Returns:
+        Dict[int, Tuple[int, int, str]]: Player id mapped to (longest win streak,
+            longest loss streak, current streak such as "W3").
+    """
+    in_order = {"partition_by": GameSession.player_id, "order_by": GameSession.id}
+    flagged = _filtered(
+        session.query(
+            GameSession.id,
+            GameSession.player_id,
+            GameSession.outcome,
+            case((GameSession.outcome != func.lag(GameSession.outcome).over(**in_order), 1), else_=0).label("new_run"),
+        ),
+        player_id, since, until,
+    ).subquery()
+    numbered = session.query(
+        flagged.c.id,
+        flagged.c.player_id,
+        flagged.c.outcome,
+        func.sum(flagged.c.new_run).over(partition_by=flagged.c.player_id, order_by=flagged.c.id).label("run"),
+    ).subquery()
+    runs = (
+        session.query(
+            numbered.c.player_id,
+            func.max(numbered.c.outcome).label("outcome"),
+            func.count().label("length"),
+            func.row_number().over(
+                partition_by=numbered.c.player_id, order_by=func.max(numbered.c.id).desc()
+            ).label("recency"),
+        )
+        .group_by(numbered.c.player_id, numbered.c.run)
+        .subquery()
+    )
+    latest = runs.c.recency == 1
+    query = session.query(
+        runs.c.player_id,
+        func.max(case((runs.c.outcome == "Win", runs.c.length), else_=0)),
+        func.max(case((runs.c.outcome == "Loss", runs.c.length), else_=0)),
+        func.max(case((latest, runs.c.outcome))),
+        func.max(case((latest, runs.c.length))),
+    ).group_by(runs.c.player_id)
+    return {
+        streak_player_id: (longest_win, longest_loss, f"{outcome[0]}{length}" if outcome else "")
+        for streak_player_id, longest_win, longest_loss, outcome, length in query
+    }
+
+
+def time_buckets(session, bucket: str = "day", player_id: Optional[int] = None,
+                 since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[BucketSummary]:
+    """
+    Game totals grouped by hour, day, week or month, oldest first.
+
+    Args:
+        session: The SQLAlchemy database session.
+        bucket (str, optional): One of BUCKET_FORMATS.
+        player_id (int, optional): Only count this player's games.
+        since (datetime, optional): Only count games played at or after this time.
+        until (datetime, optional): Only count games played before this time.
+
+    Returns:
+        List[BucketSummary]: One summary per bucket that has games.
+    """
+    if bucket not in BUCKET_FORMATS:
+        raise ValueError(f"Unknown bucket {bucket!r}; choose from {', '.join(BUCKET_FORMATS)}")
+    label = func.strftime(BUCKET_FORMATS[bucket], GameSession.timestamp)
+    query = _filtered(session.query(label, *_outcome_counts()), player_id, since, until)
+    return [
+        BucketSummary(row[0], *_totals(row[1:]))
+        for row in query.group_by(label).order_by(label)
+    ]
+
+
+def page_game_sessions(session, page_size: int = 20, before_id: Optional[int] = None,
+                       player_id: Optional[int] = None, since: Optional[datetime] = None,
+                       until: Optional[datetime] = None) -> list:
+    """
+    One page of game sessions joined to the player name, newest first.
+
+    Pages are keyed on the primary key rather than an OFFSET, so every page is an
+    index range scan no matter how deep into the history it is. Pass the id of the last
+    row of a page as before_id to get the next one.
+
+    Returns:
+        list: Rows with id, timestamp, player_id, name, dealer_hand_value,
+            player_hand_value, outcome, bet and payout; fewer than page_size on the
+            last page.
+    """
+    query = session.query(
+        GameSession.id,
+        GameSession.timestamp,
+        GameSession.player_id,
+        Player.name,
+        GameSession.dealer_hand_value,
+        GameSession.player_hand_value,
+        GameSession.outcome,
+        GameSession.bet,
+        GameSession.payout,
+    ).join(Player)
+    query = _filtered(query, player_id, since, until)
+    if before_id is not None:
+        query = query.filter(GameSession.id < before_id)
+    return query.order_by(GameSession.id.desc()).limit(page_size).all()
+
+
+def iter_game_sessions(session, player_id: Optional[int] = None, since: Optional[datetime] = None,
+                       until: Optional[datetime] = None, page_size: int = 1000) -> Iterator:
+    """Every game session in range, newest first, read a page at a time with page_game_sessions."""
+    before_id = None
+    while True:
+        page = page_game_sessions(session, page_size, before_id, player_id, since, until)
+        yield from page
+        if len(page) < page_size:
+            return
+        before_id = page[-1].id
+
+
+def find_player_id(session, name: str) -> Optional[int]:
+    """Id of the player with this name, or None."""
+    row = session.query(Player.id).filter_by(name=name).first()
+    return row[0] if row else None
@@ -0,0 +1,209 @@
+# bulk ingestion of game sessions, e.g. from simulations
+#
+# Rows are plain tuples in SESSION_COLUMNS order and go into game_sessions through
+# executemany batches instead of one ORM object per row; on SQLite the tuples are handed
+# straight to the driver. A SessionWriter does the inserting on a background thread, fed
+# through a bounded queue, so the producer keeps simulating while SQLite writes.
+import queue
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from models import GameSession
+from rules import HOUSE_RULES, Rules
+from simulator import Strategy, mimic_dealer, simulate_rounds
+
+DEFAULT_BATCH_SIZE = 10000
+# batches the producer may run ahead of the writer before it blocks
+QUEUE_BATCHES = 8
+
+# columns of a row tuple; the timestamp is left to the server default
+SESSION_COLUMNS = ("player_id", "dealer_hand_value", "player_hand_value", "outcome", "bet", "payout", "num_decks")
+SessionRow = Tuple
+
+_INSERT_GAME_SESSION = insert(GameSession.__table__)
+_INSERT_GAME_SESSION_SQL = (
+    f"INSERT INTO {GameSession.__tablename__} ({', '.join(SESSION_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in SESSION_COLUMNS)})"
+)
+_STOP = object()
+
+
+def outcome_of(payout: float) -> str:
+    """The recorded outcome of a round from the amount returned per unit bet."""
+    if payout > 1:
+        return "Win"
+    if payout == 1:
+        return "Tie"
+    return "Loss"
+
+
+def insert_game_sessions(engine, rows: Iterable[SessionRow], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Insert game_sessions rows in executemany batches, one transaction per batch.
+
+    Args:
+        engine: The engine to write to.
+        rows (iterable): Tuples of the SESSION_COLUMNS values.
+        batch_size (int, optional): Rows per INSERT executemany and transaction.
+
+    Returns:
+        int: Number of rows inserted.
+    """
+    written = 0
+    batch: List[SessionRow] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            written += _insert_batch(engine, batch)
+            batch = []
+    if batch:
+        written += _insert_batch(engine, batch)
+    return written
+
+
+def _insert_batch(engine, batch: List[SessionRow]) -> int:
+    with engine.begin() as connection:
+        if connection.dialect.paramstyle == "qmark":
+            # skip SQLAlchemy's per-row parameter processing
+            connection.exec_driver_sql(_INSERT_GAME_SESSION_SQL, batch)
+        else:
+            connection.execute(_INSERT_GAME_SESSION, [dict(zip(SESSION_COLUMNS, row)) for row in batch])
+    return len(batch)
+
+
+class SessionWriter:
+    """
+    Writes game_sessions rows on a background thread.
+
+    write() only appends to the current batch; full batches are handed to the writer
+    thread through a bounded queue, so the caller blocks only when the database falls
+    QUEUE_BATCHES batches behind. close() flushes the last partial batch, waits for
+    the thread and re-raises any error it hit; abort() drops every row not yet written
+    instead. Use it as a context manager, which aborts when the block raises, so a
+    failed run leaves only the batches already committed.
+
+    Attributes:
+        engine: The engine rows are written to.
+        batch_size (int): Rows per INSERT executemany and transaction.
+        rows_written (int): Rows committed so far.
+    """
+
+    def __init__(self, engine, batch_size: int = DEFAULT_BATCH_SIZE):
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+        self.engine = engine
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self._batch: List[SessionRow] = []
+        self._queue: queue.Queue = queue.Queue(maxsize=QUEUE_BATCHES)
+        self._error: Optional[BaseException] = None
+        self._aborted = False
+        self._thread = threading.Thread(target=self._run, name="session-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._queue.get()
+            if batch is _STOP:
+                return
+            if self._error is not None or self._aborted:
+                continue  # keep draining so the producer never blocks on a dead writer
+            try:
+                self.rows_written += _insert_batch(self.engine, batch)
+            except BaseException as error:  # handed to the producer by close()
+                self._error = error
+
+    def write(self, row: SessionRow) -> None:
+        """Queue one row, a tuple of the SESSION_COLUMNS values, for insertion."""
+        self._batch.append(row)
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def write_many(self, rows: Iterable[SessionRow]) -> None:
+        """Queue many rows for insertion."""
+        for row in rows:
+            self.write(row)
+
+    def _flush(self) -> None:
+        if self._error is not None:
+            raise self._error
+        self._queue.put(self._batch)
+        self._batch = []
+
+    def close(self) -> None:
+        """Write the remaining rows, stop the thread and raise any error it hit."""
+        if self._thread.is_alive():
+            if self._batch:
+                self._queue.put(self._batch)
+                self._batch = []
+            self._queue.put(_STOP)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def abort(self) -> None:
+        """Drop the rows not yet written and stop the thread, without raising its error."""
+        self._aborted = True
+        self._batch = []
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def __enter__(self) -> "SessionWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def __repr__(self):
+        return (f"<SessionWriter(batch_size={self.batch_size}, rows_written={self.rows_written}, "
+                f"queued_batches={self._queue.qsize()})>")
+
+
+def record_simulation(
+    engine,
+    player_id: int,
+    n_rounds: int,
+    strategy: Strategy = mimic_dealer,
+    rules: Rules = HOUSE_RULES,
+    seed: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    bet: int = 1,
+) -> Dict[str, float]:
+    """
+    Simulate rounds and store every one as a game session of the given player.
+
+    Each round is stored with its bet, payout and shoe size, like a hand played at the
+    table, so it counts towards the money totals of the history. The cards are not
+    kept, so replay skips these sessions.
+
+    Args:
+        engine: The engine to write to.
+        player_id (int): The player the sessions are recorded for.
+        n_rounds (int): Number of rounds to play.
+        strategy (Strategy, optional): The player's hit/stand policy.
+        rules (Rules, optional): The table rules.
+        seed (int, optional): Seed for reproducible runs.
+        batch_size (int, optional): Rows per INSERT executemany and transaction.
+        bet (int, optional): The amount bet on every round.
+
+    Returns:
+        Dict[str, float]: Rows written, seconds taken and rows per second.
+    """
+    start = time.perf_counter()
+    with SessionWriter(engine, batch_size) as writer:
+        write = writer.write
+        for payout, player_total, dealer_total in simulate_rounds(n_rounds, strategy, rules, seed):
+            write((player_id, dealer_total, player_total, outcome_of(payout), bet, payout * bet, rules.num_decks))
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": writer.rows_written,
+        "seconds": elapsed,
+        "rows_per_sec": writer.rows_written / elapsed if elapsed else 0.0,
+    }
@@ -0,0 +1,83 @@
+# unit of work for a player's bankroll and game history
+#
+# The game used to commit after every bet, every payout and every recorded hand, each
+# time re-querying the Player row. A Ledger loads the row once, keeps it in the
+# session and applies bet and payout deltas to it in memory; the changes of a round,
+# together with its GameSession row, are flushed as one transaction when the round ends.
+from models import Player
+
+
+class Ledger:
+    """
+    Holds a player's money bag in the session and commits whole rounds at a time.
+
+    A round is all or nothing: if the program dies before end_round commits it, the
+    bet, the payout and the recorded hand are all lost together, so the stored money
+    bag always matches the stored history. Used as a context manager, an exception
+    rolls back the round in progress and a normal exit commits whatever is pending.
+
+    Attributes:
+        session: The SQLAlchemy session the player row lives in.
+        player (Player): The player whose money is tracked.
+        rounds_per_commit (int): Rounds batched into one transaction; 1 for interactive
+            play, more for simulations where losing the last few rounds on a crash is fine.
+        pending_rounds (int): Rounds ended since the last commit.
+        commits (int): Number of transactions committed so far.
+    """
+
+    def __init__(self, session, player_id: int, rounds_per_commit: int = 1):
+        if rounds_per_commit < 1:
+            raise ValueError("A ledger has to commit at least every round")
+        self.session = session
+        self.player = session.get(Player, player_id)
+        if self.player is None:
+            raise Exception("Player not found")
+        self.rounds_per_commit = rounds_per_commit
+        self.pending_rounds = 0
+        self.commits = 0
+
+    @property
+    def money_bag(self):
+        return self.player.money_bag
+
+    @money_bag.setter
+    def money_bag(self, amount) -> None:
+        self.player.money_bag = amount
+
+    def get_money_bag(self, session=None, player_id: int = None):
+        """The money bag, with the signature of blackjack.get_player_money_bag for betting.place_bets."""
+        return self.player.money_bag
+
+    def set_money_bag(self, session, player_id: int, new_amount) -> None:
+        """Set the money bag in memory, with the signature of blackjack.update_player_money_bag."""
+        self.player.money_bag = new_amount
+
+    def end_round(self) -> None:
+        """Mark the current round complete and commit once enough rounds are pending."""
+        self.pending_rounds += 1
+        if self.pending_rounds >= self.rounds_per_commit:
+            self.commit()
+
+    def commit(self) -> None:
+        """Commit every pending change in one transaction."""
+        self.session.commit()
+        self.pending_rounds = 0
+        self.commits += 1
+
+    def rollback(self) -> None:
+        """Throw away the uncommitted rounds and reload the money bag from the database."""
+        self.session.rollback()
+        self.pending_rounds = 0
+
+    def __enter__(self) -> "Ledger":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None:
+            self.rollback()
+        elif self.session.new or self.session.dirty or self.pending_rounds:
+            self.commit()
+
+    def __repr__(self):
+        return (f"<Ledger(player_id={self.player.id}, money_bag={self.player.money_bag}, "
+                f"pending_rounds={self.pending_rounds}, commits={self.commits})>")
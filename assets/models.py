@@ -1,7 +1,16 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey
+import os
+
+from sqlalchemy import (
+    create_engine, event, inspect, make_url, BigInteger, Column, Integer, Float, String, DateTime, ForeignKey, Index, LargeBinary
+)
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import deferred
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.sql import func
 
+from config import DB_PROFILE, DB_URL
+from hand_record import HandRecord
+
 Base = declarative_base()
 
 
@@ -21,11 +30,26 @@ class GameSession(Base):
     __tablename__ = 'game_sessions'
 
     id = Column(Integer, primary_key=True)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     player_id = Column(Integer, ForeignKey('players.id'))
     dealer_hand_value = Column(Integer)
     player_hand_value = Column(Integer)
     outcome = Column(String)
+    bet = Column(Integer)
+    payout = Column(Float)  # amount returned to the player, bet included; 0 on a loss
+    true_count = Column(Float)  # hi-lo true count when the cards were dealt
+    # packed cards and actions (see hand_record.py); only loaded when read
+    hand_data = deferred(Column(LargeBinary))
+    # the shoe the round was dealt from: its size, the seed of its shuffle (see
+    # shoe.Shoe.shuffle) and the position of the round's first card, enough to replay it
+    num_decks = Column(Integer)
+    shoe_seed = Column(BigInteger)
+    shoe_position = Column(Integer)
+
+    # per-player lookups; carrying id and outcome lets the streak summary walk a
+    # player's games in order from the index alone, without touching the table (the
+    # outcome summary also reads bet and payout from the table for the net money)
+    __table_args__ = (Index("ix_game_sessions_player_id", player_id, id, outcome),)
 
     def __repr__(self):
         return (f"<GameSession(id={self.id}, timestamp='{self.timestamp}', "
@@ -34,10 +58,128 @@ class GameSession(Base):
                 f"player_hand_value={self.player_hand_value}, "
                 f"outcome='{self.outcome}')>")
 
+    @property
+    def hand_record(self):
+        """The cards and actions of the round as a lazily unpacked HandRecord, or None."""
+        return HandRecord(self.hand_data) if self.hand_data is not None else None
+
+
+class AdviceCacheEntry(Base):
+    """An AI answer kept across games, see advice.AdviceStore."""
+    __tablename__ = 'advice_cache'
+
+    key = Column(Integer, primary_key=True)  # see advice.encode_advice_key
+    text = Column(String, nullable=False)
+    created = Column(Float, nullable=False)  # time.time() when the answer was fetched
+    hits = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<AdviceCacheEntry(key={self.key}, hits={self.hits}, text='{self.text}')>"
+
+
+def add_missing_columns(engine):
+    """
+    Add columns declared on the models but missing from existing tables.
+
+    Databases created before a column was added to a model get it through ALTER TABLE
+    ADD COLUMN; the new column is empty (NULL) for rows recorded before it existed.
+
+    Returns:
+        list: The "table.column" names that were added.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}')
+                added.append(f"{table.name}.{column.name}")
+    return added
+
 
 def init_db(engine):
+    """Create missing tables, columns and indexes, bringing an older database up to date."""
     Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    # create_all only builds indexes along with a new table; databases from before
+    # the indexes were declared get them here
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+# PRAGMAs applied to every new SQLite connection of the performance profile: WAL lets
+# readers run alongside the writer and, with synchronous=NORMAL, only syncs at
+# checkpoints rather than on every commit; a negative cache_size is in KiB.
+SQLITE_PERFORMANCE_PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -65536),
+    ("mmap_size", 268435456),
+    ("temp_store", "MEMORY"),
+)
+DB_PROFILES = ("default", "performance", "memory")
+
+
+def _apply_pragmas(engine, pragmas) -> None:
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def is_memory_url(db_url) -> bool:
+    """Whether a database URL names an in-memory SQLite database, e.g. sqlite:// or sqlite:///:memory:."""
+    url = make_url(db_url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def get_db_engine(db_url, profile="default", pool_size=5):
+    """
+    Create the engine for a database URL, tuned by profile.
+
+    Args:
+        db_url (str): SQLAlchemy database URL; ignored by the memory profile.
+        profile (str, optional): One of DB_PROFILES.
+            - "default": SQLAlchemy's defaults, every commit synced to disk.
+            - "performance": for SQLite files, WAL journaling, synchronous=NORMAL, a
+              64 MiB page cache, 256 MiB of memory-mapped I/O and a connection pool
+              that threads can share. An in-memory SQLite URL gets the memory profile,
+              as every pooled connection would open a database of its own.
+            - "memory": a private in-memory SQLite database shared by every thread
+              through a single connection, for tests and simulations.
+        pool_size (int, optional): Connections kept open by the performance profile.
+
+    Returns:
+        Engine: The configured engine.
+    """
+    if profile not in DB_PROFILES:
+        raise ValueError(f"Unknown database profile {profile!r}; choose from {', '.join(DB_PROFILES)}")
+    if profile == "memory" or (profile == "performance" and is_memory_url(db_url)):
+        return create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+    if profile == "default" or not db_url.startswith("sqlite"):
+        return create_engine(db_url)
+    engine = create_engine(
+        db_url,
+        connect_args={"check_same_thread": False},
+        pool_size=pool_size,
+        max_overflow=2 * pool_size,
+    )
+    _apply_pragmas(engine, SQLITE_PERFORMANCE_PRAGMAS)
+    return engine
 
 
-def get_db_engine(db_url):
-    return create_engine(db_url)
\ No newline at end of file
+def get_configured_db_engine():
+    """The game's engine, from BLACKJACK_DB_URL/BLACKJACK_DB_PROFILE or config.DB_URL/DB_PROFILE."""
+    return get_db_engine(os.getenv("BLACKJACK_DB_URL", DB_URL), os.getenv("BLACKJACK_DB_PROFILE", DB_PROFILE))
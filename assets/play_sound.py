@@ -1,14 +1,111 @@
-import pygame
+import os
+from typing import List
+
+from config import AUDIO_BACKEND
+
+SOUND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cardsounds")
+NUM_CHANNELS = 8
+
+
+class NullAudioBackend:
+    """Plays nothing; used for headless runs and whenever audio is unavailable."""
+    name = "null"
+
+    def play(self, file_name: str) -> None:
+        pass
+
+
+class RecordingAudioBackend:
+    """Plays nothing but remembers every cue, so tests can assert which sounds fired."""
+    name = "recording"
+
+    def __init__(self):
+        self.played: List[str] = []
+
+    def play(self, file_name: str) -> None:
+        self.played.append(file_name)
+
+
+class PygameAudioBackend:
+    """
+    Plays sound effects through pygame without blocking the game.
+
+    pygame is imported and the mixer initialized on the first play, and every WAV file
+    in the sound directory is loaded into a pygame Sound up front. play() hands the
+    sound to a free mixer channel and returns immediately; when all channels are busy
+    the effect is dropped, since a late card sound is worse than none. Without pygame or
+    an audio device every call is a no-op.
+    """
+    name = "pygame"
+
+    def __init__(self, sound_dir: str = SOUND_DIR):
+        self.sound_dir = sound_dir
+        self.sounds = {}
+        self.enabled = False
+        self._started = False
+        self._mixer = None
+
+    def start(self) -> None:
+        """Initialize the mixer and preload the sounds; safe to call more than once."""
+        if self._started:
+            return
+        self._started = True
+        try:
+            import pygame
+        except ImportError:
+            return
+        try:
+            pygame.mixer.init()
+            pygame.mixer.set_num_channels(NUM_CHANNELS)
+            for file_name in sorted(os.listdir(self.sound_dir)):
+                if file_name.endswith(".wav"):
+                    self.sounds[file_name] = pygame.mixer.Sound(os.path.join(self.sound_dir, file_name))
+        except (pygame.error, OSError):
+            self.sounds = {}
+            return
+        self._mixer = pygame.mixer
+        self.enabled = True
+
+    def play(self, file_name: str) -> None:
+        """Start playing a preloaded sound on a free channel and return at once."""
+        self.start()
+        sound = self.sounds.get(file_name)
+        if sound is None:
+            return
+        # find_channel() without force returns None rather than cutting off a playing sound
+        channel = self._mixer.find_channel()
+        if channel is not None:
+            channel.play(sound)
+
+
+AUDIO_BACKENDS = {
+    NullAudioBackend.name: NullAudioBackend,
+    RecordingAudioBackend.name: RecordingAudioBackend,
+    PygameAudioBackend.name: PygameAudioBackend,
+}
+
+_backend = None
+
+
+def get_audio_backend():
+    """The active backend, created on first use from BLACKJACK_AUDIO or config.AUDIO_BACKEND."""
+    global _backend
+    if _backend is None:
+        name = os.getenv("BLACKJACK_AUDIO", AUDIO_BACKEND).lower()
+        _backend = AUDIO_BACKENDS.get(name, NullAudioBackend)()
+    return _backend
+
+
+def set_audio_backend(backend) -> None:
+    """Replace the active backend, e.g. with a RecordingAudioBackend in tests."""
+    global _backend
+    _backend = backend
+
 
-"""get_busy function returns 'true' if sound is still playing when checked. Clock().tick(10) defines an amount of time
-to wait before checking if the sound has finished playing."""
 def play_sound(file_path: str):
-    pygame.mixer.init()
-    pygame.mixer.music.load(file_path)
-    pygame.mixer.music.play()
-    while pygame.mixer.music.get_busy():
-        pygame.time.Clock().tick(10)
-        
+    """Play a sound from the cardsounds directory without waiting for it to finish."""
+    get_audio_backend().play(os.path.basename(file_path))
+
 def play_card_draw_sound():
     """Plays the sound effect for drawing a card."""
     play_sound("cardsounds/card-sounds-35956.wav")
@@ -16,11 +113,11 @@ def play_card_draw_sound():
 def play_shuffle_sound():
     """Plays the sound effect for shuffling the deck."""
     play_sound("cardsounds/shuffle-cards-46455.wav")
-    
+
 def play_win_sound():
     """Plays a victory sound"""
     play_sound("cardsounds/success-1-6297.wav")
-    
+
 def play_loss_sound():
     """Plays game loss sound"""
     play_sound("cardsounds/game_loss.wav")
@@ -28,19 +125,19 @@ def play_loss_sound():
 def coin_sound():
     """Plays a coin sound"""
     play_sound("cardsounds/coin_sound.wav")
-    
+
 def play_again_sound():
     """Plays sound when entering name"""
     play_sound("cardsounds/play_again.wav")
-    
+
 def play_title_music():
     """Plays music on title screen"""
     play_sound("cardsounds/game_music_loop.wav")
-    
+
 def play_start_sound():
     """Plays sound at game start"""
     play_sound("cardsounds/start_game_sound.wav")
-    
+
 def play_cheer_sound():
     """Plays cheering sound when player hits blackjack"""
-    play_sound("cardsounds/blackjack_cheer.wav")
\ No newline at end of file
+    play_sound("cardsounds/blackjack_cheer.wav")
@@ -0,0 +1,115 @@
+# text renderer for hands and the table
+#
+# Every ASCII card in ascii.deck_of_cards is split into rows and padded to one common
+# width and height once, at import, and stored by card code. Rendering a hand is then
+# only a join of ready-made rows into one string, and a whole frame reaches the
+# terminal in a single console.print instead of one call per row fragment.
+import time
+from typing import Iterable, Optional, Tuple
+
+from ascii import deck_of_cards
+from cards import CARD_NAMES
+
+HIDDEN_NAME = "Hidden"
+CARD_GAP = " "
+
+
+def _split_sprite(art: str) -> Tuple[str, ...]:
+    """The rows of an ASCII card without the leading newline of the art table."""
+    rows = art.split("\n")
+    return tuple(rows[1:] if rows and not rows[0] else rows)
+
+
+_raw_sprites = [_split_sprite(deck_of_cards[name]) for name in CARD_NAMES]
+_raw_back = _split_sprite(deck_of_cards["Card Back"])
+SPRITE_HEIGHT = max(len(rows) for rows in _raw_sprites + [_raw_back])
+SPRITE_WIDTH = max(len(row) for rows in _raw_sprites + [_raw_back] for row in rows)
+
+
+def _pad_sprite(rows: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Pad every row to SPRITE_WIDTH and the sprite to SPRITE_HEIGHT rows."""
+    padded = tuple(row.ljust(SPRITE_WIDTH) for row in rows)
+    return padded + (" " * SPRITE_WIDTH,) * (SPRITE_HEIGHT - len(padded))
+
+
+# padded rows of every card code, and of the card back used for the hole card
+CARD_SPRITES = tuple(_pad_sprite(rows) for rows in _raw_sprites)
+CARD_BACK_SPRITE = _pad_sprite(_raw_back)
+del _raw_sprites, _raw_back
+
+
+def render_hand(
+    hand: Iterable[int],
+    player: str,
+    hide_dealer_card: bool = False,
+    value: Optional[int] = None,
+) -> str:
+    """
+    Compose a hand into one block of text with the cards side by side.
+
+    Args:
+        hand (iterable): The card codes in the hand.
+        player (str): The name shown above the hand.
+        hide_dealer_card (bool, optional): Show the dealer's second card face down.
+        value (int, optional): The hand value to show underneath; omitted when None.
+
+    Returns:
+        str: The hand as Rich markup, ready for a single console.print.
+    """
+    names = []
+    sprites = []
+    for i, card in enumerate(hand):
+        if hide_dealer_card and player == "Dealer" and i == 1:
+            names.append(HIDDEN_NAME)
+            sprites.append(CARD_BACK_SPRITE)
+        else:
+            names.append(CARD_NAMES[card])
+            sprites.append(CARD_SPRITES[card])
+
+    lines = [f"[bold blue]{player}'s hand:[/bold blue]"]
+    lines.extend(names)
+    if sprites:
+        lines.extend(CARD_GAP.join(row) for row in zip(*sprites))
+    if value is not None:
+        lines.append(f"Value: {value}\n")
+    return "\n".join(lines)
+
+
+class FrameStats:
+    """
+    Running timings of the frames written by print_frame.
+
+    Attributes:
+        frames (int): Number of frames written.
+        elapsed (float): Seconds spent composing and writing them.
+        slowest (float): Seconds taken by the slowest frame.
+    """
+
+    def __init__(self):
+        self.frames = 0
+        self.elapsed = 0.0
+        self.slowest = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.frames += 1
+        self.elapsed += seconds
+        self.slowest = max(self.slowest, seconds)
+
+    @property
+    def mean_ms(self) -> float:
+        """Average milliseconds per frame."""
+        return 1000 * self.elapsed / self.frames if self.frames else 0.0
+
+    def __repr__(self):
+        return (f"<FrameStats(frames={self.frames}, mean_ms={self.mean_ms:.3f}, "
+                f"slowest_ms={1000 * self.slowest:.3f})>")
+
+
+frame_stats = FrameStats()
+
+
+def print_frame(console, *blocks: str) -> None:
+    """Write rendered blocks to the console in one call and record how long the write took."""
+    start = time.perf_counter()
+    console.print("\n".join(blocks))
+    frame_stats.record(time.perf_counter() - start)
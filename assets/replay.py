@@ -0,0 +1,226 @@
+# headless replay of recorded game sessions
+#
+# A round played in the interactive game is stored with the seed of the shoe's shuffle
+# and the position of its first card (see record_game_session). Replaying shuffles a
+# shoe with the same seed, deals from the same position, plays the recorded hits through
+# simulator.play_round and checks the stored cards, totals, outcome and payout against
+# what the rules produce. Consecutive rounds of a shoe share its seed, so the shoe is
+# only reshuffled when the seed changes.
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import func
+
+from cards import CARD_VALUES
+from hand_record import HandRecord
+from ingest import outcome_of
+from models import GameSession
+from rules import HOUSE_RULES, Rules
+from shoe import Shoe
+from simulator import play_round
+
+# rows fetched from the database at a time
+REPLAY_BATCH_SIZE = 10000
+# mismatches kept in a report for display; all of them are counted
+MAX_REPORTED_MISMATCHES = 100
+
+
+class ReplayedRound(NamedTuple):
+    """The cards and result of a round dealt again from its shoe."""
+    payout: float  # amount returned per unit bet
+    player_cards: List[int]
+    dealer_cards: List[int]
+    player_total: int
+    dealer_total: int
+
+
+class ReplayMismatch(NamedTuple):
+    """A recorded value of a game session that the replay did not reproduce."""
+    session_id: int
+    field: str
+    recorded: object
+    replayed: object
+
+
+class ReplayReport:
+    """
+    Counters for a batch of replayed game sessions.
+
+    Attributes:
+        sessions (int): Sessions that were replayed.
+        verified (int): Replayed sessions matching their record in every field.
+        mismatched (int): Replayed sessions with at least one mismatch.
+        skipped (int): Sessions that could not be replayed: recorded without a shoe
+            seed or cards, e.g. by simulations or older versions of the game, or
+            whose shoe ran out mid-round.
+        mismatches (list): The first MAX_REPORTED_MISMATCHES mismatches found.
+        recorded_net (float): Recorded payouts minus bets over the replayed sessions.
+        replayed_net (float): The same, with the payouts worked out by the replay.
+        elapsed (float): Seconds taken.
+    """
+
+    def __init__(self):
+        self.sessions = 0
+        self.verified = 0
+        self.mismatched = 0
+        self.skipped = 0
+        self.mismatches: List[ReplayMismatch] = []
+        self.recorded_net = 0.0
+        self.replayed_net = 0.0
+        self.elapsed = 0.0
+
+    @property
+    def sessions_per_sec(self) -> float:
+        return self.sessions / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return (f"<ReplayReport(sessions={self.sessions}, verified={self.verified}, "
+                f"mismatched={self.mismatched}, skipped={self.skipped}, "
+                f"sessions_per_sec={self.sessions_per_sec:.0f})>")
+
+
+def replay_round(shoe: Shoe, shoe_seed: int, shoe_position: int, hits: int,
+                 rules: Rules = HOUSE_RULES) -> Optional[ReplayedRound]:
+    """
+    Deal a recorded round again and play it out.
+
+    Args:
+        shoe (Shoe): A shoe of the round's size, reshuffled only if its seed differs.
+        shoe_seed (int): Seed of the shuffle the round was dealt from.
+        shoe_position (int): Position of the round's first card.
+        hits (int): Number of times the player hit.
+        rules (Rules, optional): The table rules.
+
+    Returns:
+        ReplayedRound: The round, or None if the shoe ran out before it was over, as the
+            seed of the shuffle that followed was not recorded.
+    """
+    if shoe.seed != shoe_seed:
+        shoe.shuffle(shoe_seed)
+    shoe.position = shoe_position
+    reshuffles = shoe.reshuffles
+    deal = shoe.deal
+    dealt = []
+
+    def draw() -> int:
+        card = deal()
+        dealt.append(card)
+        return CARD_VALUES[card]
+
+    hits_left = hits
+
+    def recorded_strategy(total: int, soft: bool, upcard: int) -> str:
+        nonlocal hits_left
+        if hits_left:
+            hits_left -= 1
+            return "hit"
+        return "stand"
+
+    payout, _, player_total, dealer_total = play_round(draw, recorded_strategy, rules)
+    if shoe.reshuffles != reshuffles:
+        return None
+    # cards come out as player, player, dealer, dealer, the player's hits, the dealer's
+    player_end = 4 + hits - hits_left
+    return ReplayedRound(
+        payout, dealt[:2] + dealt[4:player_end], dealt[2:4] + dealt[player_end:], player_total, dealer_total,
+    )
+
+
+def verify_game_session(game_session, shoes: Dict[int, Shoe],
+                        rules: Rules = HOUSE_RULES) -> Optional[List[ReplayMismatch]]:
+    """
+    Replay one recorded game session and compare it with its record.
+
+    Args:
+        game_session: A GameSession, or a row with the same attributes.
+        shoes (dict): Shoes by number of decks, reused from one session to the next.
+        rules (Rules, optional): The table rules.
+
+    Returns:
+        List[ReplayMismatch]: The fields that differ, empty when the record is verified;
+            None if the session cannot be replayed.
+    """
+    if game_session.shoe_seed is None or game_session.hand_data is None:
+        return None
+    record = HandRecord(game_session.hand_data)
+    shoe = shoes.get(game_session.num_decks)
+    if shoe is None:
+        shoe = shoes[game_session.num_decks] = Shoe(game_session.num_decks)
+    replayed = replay_round(
+        shoe, game_session.shoe_seed, game_session.shoe_position, record.actions.count("hit"), rules
+    )
+    if replayed is None:
+        return None
+
+    session_id = game_session.id
+    mismatches = []
+    for field, recorded, replayed_value in (
+        ("player_cards", record.player_cards, replayed.player_cards),
+        ("dealer_cards", record.dealer_cards, replayed.dealer_cards),
+        ("player_hand_value", game_session.player_hand_value, replayed.player_total),
+        ("dealer_hand_value", game_session.dealer_hand_value, replayed.dealer_total),
+        ("outcome", game_session.outcome, outcome_of(replayed.payout)),
+    ):
+        if recorded != replayed_value:
+            mismatches.append(ReplayMismatch(session_id, field, recorded, replayed_value))
+    if game_session.bet is not None and game_session.payout != replayed.payout * game_session.bet:
+        mismatches.append(ReplayMismatch(session_id, "payout", game_session.payout, replayed.payout * game_session.bet))
+    return mismatches
+
+
+def replay_history(session, player_id: Optional[int] = None, rules: Rules = HOUSE_RULES) -> ReplayReport:
+    """
+    Replay every recorded game session of a player, or of the whole database.
+
+    Sessions are streamed in id order, REPLAY_BATCH_SIZE rows at a time, so the whole
+    history is never held in memory.
+
+    Args:
+        session: The SQLAlchemy database session.
+        player_id (int, optional): Only replay this player's games.
+        rules (Rules, optional): The table rules the games were played under.
+
+    Returns:
+        ReplayReport: The counts of verified, mismatched and skipped sessions.
+    """
+    report = ReplayReport()
+    start = time.perf_counter()
+    total = session.query(func.count(GameSession.id))
+    query = session.query(
+        GameSession.id,
+        GameSession.dealer_hand_value,
+        GameSession.player_hand_value,
+        GameSession.outcome,
+        GameSession.bet,
+        GameSession.payout,
+        GameSession.hand_data,
+        GameSession.num_decks,
+        GameSession.shoe_seed,
+        GameSession.shoe_position,
+    ).filter(GameSession.shoe_seed.isnot(None))
+    if player_id is not None:
+        total = total.filter(GameSession.player_id == player_id)
+        query = query.filter(GameSession.player_id == player_id)
+
+    shoes: Dict[int, Shoe] = {}
+    for game_session in query.order_by(GameSession.id).yield_per(REPLAY_BATCH_SIZE):
+        mismatches = verify_game_session(game_session, shoes, rules)
+        if mismatches is None:
+            report.skipped += 1
+            continue
+        report.sessions += 1
+        if mismatches:
+            report.mismatched += 1
+            report.mismatches.extend(mismatches[:MAX_REPORTED_MISMATCHES - len(report.mismatches)])
+        else:
+            report.verified += 1
+        if game_session.bet is not None:
+            report.recorded_net += game_session.payout - game_session.bet
+            replayed_payout = next(
+                (mismatch.replayed for mismatch in mismatches if mismatch.field == "payout"), game_session.payout
+            )
+            report.replayed_net += replayed_payout - game_session.bet
+    # sessions recorded without a shoe seed were never read, but count as skipped too
+    report.skipped = total.scalar() - report.sessions
+    report.elapsed = time.perf_counter() - start
+    return report
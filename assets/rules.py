@@ -0,0 +1,52 @@
+# table rules shared by the game, the simulator and the strategy engine
+from typing import NamedTuple
+
+from config import BLACKJACK_PAYOUT, DEALER_STANDS_ON, PUSH_PAYOUT, WIN_PAYOUT
+
+
+# table limits: (highest money bag in the tier, max bet), see max_table_bet
+TABLE_LIMITS = ((250, 20), (500, 50), (1000, 100), (5000, 250), (10000, 500))
+HIGH_ROLLER_MAX_BET = 1000
+
+
+class Rules(NamedTuple):
+    """
+    A rule set for a blackjack table.
+
+    The defaults reproduce the house rules of the interactive game in blackjack.py:
+    a single deck, dealer hits below 17 and stands on all 17s, a natural returns 2.5x
+    the bet, a tie returns the bet and the player may only hit or stand.
+
+    Attributes:
+        num_decks (int): Number of 52-card decks in the shoe.
+        dealer_stands_on (int): The dealer hits any total below this value.
+        blackjack_payout (float): Amount returned per unit bet on a player natural.
+        win_payout (float): Amount returned per unit bet on a win.
+        push_payout (float): Amount returned per unit bet on a tie.
+        penetration (float): Fraction of the shoe dealt before it is reshuffled.
+        double_allowed (bool): Whether the player may double down on the first two cards.
+        split_allowed (bool): Whether the player may split a pair (once, no double after split).
+        surrender_allowed (bool): Whether the player may give up half the bet on the first two cards.
+    """
+    num_decks: int = 1
+    dealer_stands_on: int = DEALER_STANDS_ON
+    blackjack_payout: float = BLACKJACK_PAYOUT
+    win_payout: float = WIN_PAYOUT
+    push_payout: float = PUSH_PAYOUT
+    penetration: float = 0.75
+    double_allowed: bool = False
+    split_allowed: bool = False
+    surrender_allowed: bool = False
+
+
+HOUSE_RULES = Rules()
+
+
+def max_table_bet(money_bag: float) -> int:
+    """The largest bet the table accepts from a player holding money_bag (0 when broke)."""
+    if money_bag < 1:
+        return 0
+    for ceiling, max_bet in TABLE_LIMITS:
+        if money_bag <= ceiling:
+            return max_bet
+    return HIGH_ROLLER_MAX_BET
@@ -0,0 +1,178 @@
+# table view that stays on screen and is updated in place with Rich Live
+#
+# The table is a Layout of four regions: the dealer's hand, the player's hand, the
+# bankroll and the count. Each region remembers what it shows and the lines it rendered
+# last time, so an update rebuilds only the regions whose content changed and the rest
+# are replayed from cache. Messages printed to the console while the view is live
+# scroll above it, and nothing forks a shell to clear the terminal.
+from typing import Hashable, List, Tuple
+
+from rich.console import Console, ConsoleOptions, RenderResult
+from rich.control import Control, ControlType
+from rich.layout import Layout
+from rich.live import Live
+from rich.panel import Panel
+from rich.segment import Segment
+from rich.text import Text
+
+from renderer import render_hand
+
+PANEL_BORDER_ROWS = 2
+
+
+class _Region:
+    """
+    The content of one layout region, with its rendered lines cached.
+
+    Attributes:
+        key: Whatever identifies the content; an update with the same key is ignored.
+        height (int): Rows the region needs, borders included.
+        renders (int): How many times the content was actually rendered.
+    """
+
+    def __init__(self):
+        self.key = None
+        self.panel = Panel("")
+        self.height = PANEL_BORDER_ROWS + 1
+        self.renders = 0
+        self._lines: List[List[Segment]] = []
+        self._size = None
+
+    def set(self, key: Hashable, markup: str, title: str = None) -> bool:
+        """Replace the content unless key is unchanged; return whether it changed."""
+        if key == self.key:
+            return False
+        self.key = key
+        markup = markup.rstrip("\n")
+        self.panel = Panel(Text.from_markup(markup), title=title, title_align="left")
+        self.height = markup.count("\n") + 1 + PANEL_BORDER_ROWS
+        self._size = None
+        return True
+
+    def __rich_console__(self, console: Console, options: ConsoleOptions) -> RenderResult:
+        size = (options.max_width, options.height)
+        if size != self._size:
+            self._lines = console.render_lines(self.panel, options, pad=True)
+            self._size = size
+            self.renders += 1
+        new_line = Segment.line()
+        for line in self._lines:
+            yield from line
+            yield new_line
+
+
+class TableScreen:
+    """
+    The dealer, player, bankroll and count panels of one table, kept on screen.
+
+    Call start() when the cards are dealt, update the panels as the round goes on and
+    stop() when it is over. ask() reads an answer without scrolling the table away.
+
+    Attributes:
+        console (Console): The console the view is drawn on.
+        layout (Layout): The regions of the view, named dealer, player, bankroll and count.
+        live (Live): The live display; refreshed only when a region changes.
+    """
+
+    def __init__(self, console: Console):
+        self.console = console
+        self.regions = {name: _Region() for name in ("dealer", "player", "bankroll", "count")}
+        self.layout = Layout()
+        self.layout.split_column(
+            Layout(self.regions["dealer"], name="dealer"),
+            Layout(self.regions["player"], name="player"),
+            Layout(name="status"),
+        )
+        self.layout["status"].split_row(
+            Layout(self.regions["bankroll"], name="bankroll"),
+            Layout(self.regions["count"], name="count"),
+        )
+        self.live = Live(
+            self, console=console, auto_refresh=False, redirect_stdout=False, redirect_stderr=False
+        )
+
+    @property
+    def height(self) -> int:
+        """Rows the view takes up: both hands plus the status row."""
+        status = max(self.regions["bankroll"].height, self.regions["count"].height)
+        return self.regions["dealer"].height + self.regions["player"].height + status
+
+    def __rich_console__(self, console: Console, options: ConsoleOptions) -> RenderResult:
+        self.layout["dealer"].size = self.regions["dealer"].height
+        self.layout["player"].size = self.regions["player"].height
+        self.layout["status"].size = max(self.regions["bankroll"].height, self.regions["count"].height)
+        # a Layout fills the whole terminal unless it is given a height
+        yield from self.layout.__rich_console__(console, options.update(height=self.height))
+
+    def start(self) -> None:
+        self.live.start(refresh=True)
+
+    def stop(self) -> None:
+        self.live.stop()
+
+    def __enter__(self) -> "TableScreen":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _refresh(self, changed: bool) -> None:
+        if changed and self.live.is_started:
+            self.live.refresh()
+
+    def show_hands(self, dealer_hand, player_hand, hide_dealer_card: bool = True) -> None:
+        """Show both hands; the dealer's value is shown only once the hole card is revealed."""
+        dealer_key = (tuple(dealer_hand), hide_dealer_card)
+        dealer_value = None if hide_dealer_card else dealer_hand.value
+        changed = self.regions["dealer"].set(
+            dealer_key, render_hand(dealer_hand, "Dealer", hide_dealer_card, dealer_value)
+        )
+        changed |= self.regions["player"].set(
+            tuple(player_hand), render_hand(player_hand, "Player", value=player_hand.value)
+        )
+        self._refresh(changed)
+
+    def show_bankroll(self, money_bag: float, bet: float) -> None:
+        changed = self.regions["bankroll"].set(
+            (money_bag, bet), f"Money bag: ${money_bag:,.2f}\nBet: ${bet:,.2f}", title="Bankroll"
+        )
+        self._refresh(changed)
+
+    def show_count(self, running_count: int, remaining_decks: float) -> None:
+        true_count = running_count / remaining_decks if remaining_decks else 0.0
+        changed = self.regions["count"].set(
+            (running_count, round(true_count, 2)),
+            f"Running count: {running_count:+d}\nTrue count: {true_count:+.2f}",
+            title="Hi-Lo",
+        )
+        self._refresh(changed)
+
+    def ask(self, prompt_text: str, allow_empty: bool = False) -> str:
+        """
+        Read an answer below the table, then redraw the table where it was.
+
+        The view is paused while the player types; afterwards the prompt lines are
+        erased so the table does not scroll up a copy of itself on every question.
+        """
+        if not self.live.is_started:
+            return self._read(prompt_text, allow_empty)[0]
+        self.live.stop()
+        answer, lines = self._read(prompt_text, allow_empty)
+        if self.console.is_terminal:
+            # the prompt lines, plus the blank line Live leaves after stopping
+            for _ in range(lines + 1):
+                self.console.control(Control((ControlType.CURSOR_UP, 1)), Control((ControlType.ERASE_IN_LINE, 2)))
+        self.live.start(refresh=True)
+        return answer
+
+    def _read(self, prompt_text: str, allow_empty: bool) -> Tuple[str, int]:
+        """Prompt until an answer is given; return it with the number of lines used."""
+        lines = 0
+        while True:
+            answer = self.console.input(prompt_text).strip().lower()
+            lines += 1
+            if answer or allow_empty:
+                return answer, lines
+            self.console.print("Invalid input. Please try again.", style="bold red")
+            lines += 1
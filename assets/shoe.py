@@ -0,0 +1,90 @@
+# multi-deck shoe with a cut card
+import random
+from typing import Callable, Iterator, List
+
+from cards import CARDS_PER_DECK, new_shoe
+
+
+class Shoe:
+    """
+    A shoe of 1-8 decks dealt through an index pointer.
+
+    The cards live in one array('B') that is shuffled in place; dealing just reads the
+    card under the pointer and advances it, so nothing is popped or rebuilt. Once the
+    pointer passes the cut card, needs_reshuffle turns true and the owner reshuffles
+    between rounds. Every reshuffle is announced to the registered listeners, e.g. so a
+    running count can be reset.
+
+    Each shuffle starts from the unshuffled order and is driven by a seed of its own,
+    drawn from rng, so the seed and the position are enough to deal any card again.
+
+    Attributes:
+        num_decks (int): Number of 52-card decks in the shoe.
+        cut_card (int): Number of cards dealt before a reshuffle is due.
+        position (int): Index of the next card to deal.
+        reshuffles (int): How many times the shoe has been shuffled.
+        seed (int): Seed of the current shuffle, None before the first one.
+    """
+
+    def __init__(self, num_decks: int = 1, penetration: float = 0.75, rng: random.Random = None):
+        if not 1 <= num_decks <= 8:
+            raise ValueError("A shoe holds between 1 and 8 decks")
+        if not 0 < penetration <= 1:
+            raise ValueError("Penetration must be a fraction of the shoe between 0 and 1")
+        self.num_decks = num_decks
+        self.cards = new_shoe(num_decks)
+        self.cut_card = int(len(self.cards) * penetration)
+        self.position = 0
+        self.reshuffles = 0
+        self.seed = None
+        self.rng = rng or random.Random()
+        self._reshuffle_listeners: List[Callable[[], None]] = []
+
+    def add_reshuffle_listener(self, listener: Callable[[], None]) -> None:
+        """Call listener every time the shoe is reshuffled."""
+        self._reshuffle_listeners.append(listener)
+
+    def shuffle(self, seed: int = None) -> None:
+        """
+        Gather every card back into the shoe, shuffle it and notify the listeners.
+
+        Args:
+            seed (int, optional): Seed of the shuffle, to deal a recorded shoe again.
+                Defaults to a fresh one drawn from rng.
+        """
+        self.seed = self.rng.getrandbits(63) if seed is None else seed
+        self.cards = new_shoe(self.num_decks)
+        random.Random(self.seed).shuffle(self.cards)
+        self.position = 0
+        self.reshuffles += 1
+        for listener in self._reshuffle_listeners:
+            listener()
+
+    def deal(self) -> int:
+        """Deal the next card code, reshuffling first if the shoe has run out."""
+        if self.position >= len(self.cards):
+            self.shuffle()
+        card = self.cards[self.position]
+        self.position += 1
+        return card
+
+    @property
+    def needs_reshuffle(self) -> bool:
+        """Whether the cut card has come out."""
+        return self.position >= self.cut_card
+
+    @property
+    def remaining_decks(self) -> float:
+        """Undealt cards expressed in decks, as used for the true count."""
+        return len(self) / CARDS_PER_DECK
+
+    def __len__(self) -> int:
+        return len(self.cards) - self.position
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the undealt cards."""
+        return iter(self.cards[self.position:])
+
+    def __repr__(self):
+        return (f"<Shoe(num_decks={self.num_decks}, remaining={len(self)}, "
+                f"cut_card={self.cut_card}, reshuffles={self.reshuffles})>")
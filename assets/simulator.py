@@ -0,0 +1,268 @@
+# headless Monte Carlo simulation of the blackjack rules used in blackjack.py
+import os
+import random
+import time
+from multiprocessing import Pool
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from cards import CARD_VALUES
+from rules import HOUSE_RULES, Rules
+from shoe import Shoe
+from strategy import basic_strategy
+
+# A strategy receives (player total, soft hand?, dealer upcard value) and returns "hit" or "stand".
+Strategy = Callable[[int, bool, int], str]
+
+
+def mimic_dealer(total: int, soft: bool, upcard: int) -> str:
+    """Hit below 17 exactly like the dealer does."""
+    return "hit" if total < 17 else "stand"
+
+
+def never_bust(total: int, soft: bool, upcard: int) -> str:
+    """Only hit when the next card cannot bust the hand."""
+    return "hit" if total <= 11 or (soft and total < 18) else "stand"
+
+
+def always_stand(total: int, soft: bool, upcard: int) -> str:
+    """Stand on the first two cards."""
+    return "stand"
+
+
+STRATEGIES: Dict[str, Strategy] = {
+    "mimic-dealer": mimic_dealer,
+    "never-bust": never_bust,
+    "always-stand": always_stand,
+    "basic": basic_strategy,
+}
+
+
+class SimulationResult:
+    """Aggregate counters for a batch of simulated rounds, one unit bet per round."""
+
+    def __init__(self, rounds=0, wins=0, losses=0, ties=0, blackjacks=0, net_units=0.0, elapsed=0.0):
+        self.rounds = rounds
+        self.wins = wins
+        self.losses = losses
+        self.ties = ties
+        self.blackjacks = blackjacks
+        self.net_units = net_units
+        self.elapsed = elapsed
+
+    @property
+    def house_edge(self) -> float:
+        """Fraction of each unit bet the house keeps on average."""
+        return -self.net_units / self.rounds if self.rounds else 0.0
+
+    @property
+    def blackjack_frequency(self) -> float:
+        return self.blackjacks / self.rounds if self.rounds else 0.0
+
+    @property
+    def hands_per_sec(self) -> float:
+        return self.rounds / self.elapsed if self.elapsed else 0.0
+
+    def merge(self, other: "SimulationResult") -> "SimulationResult":
+        """Fold another batch of counters into this one, in place, and return self."""
+        self.rounds += other.rounds
+        self.wins += other.wins
+        self.losses += other.losses
+        self.ties += other.ties
+        self.blackjacks += other.blackjacks
+        self.net_units += other.net_units
+        self.elapsed += other.elapsed
+        return self
+
+    def __repr__(self):
+        return (f"<SimulationResult(rounds={self.rounds}, wins={self.wins}, "
+                f"losses={self.losses}, ties={self.ties}, blackjacks={self.blackjacks}, "
+                f"net_units={self.net_units}, house_edge={self.house_edge:.4%}, "
+                f"hands_per_sec={self.hands_per_sec:.0f})>")
+
+
+def play_round(draw: Callable[[], int], strategy: Strategy, rules: Rules) -> Tuple[float, bool, int, int]:
+    """
+    Play one round without any I/O, following the decision tree of play_game.
+
+    Args:
+        draw (callable): Returns the value of the next card in the shoe.
+        strategy (Strategy): Decides whether the player hits or stands.
+        rules (Rules): The table rules.
+
+    Returns:
+        Tuple[float, bool, int, int]: The amount returned per unit bet, whether the player
+            had a natural, and the final player and dealer totals.
+    """
+    player_total = 0
+    player_aces = 0
+    for value in (draw(), draw()):
+        player_total += value
+        if value == 11:
+            player_aces += 1
+    if player_total > 21:
+        player_total -= 10
+        player_aces -= 1
+
+    upcard = draw()
+    dealer_total = upcard + draw()
+    dealer_aces = (upcard == 11) + (dealer_total - upcard == 11)
+    if dealer_total > 21:
+        dealer_total -= 10
+        dealer_aces -= 1
+
+    if player_total == 21 and dealer_total < 21:
+        return rules.blackjack_payout, True, player_total, dealer_total
+
+    while player_total < 21:
+        if strategy(player_total, player_aces > 0, upcard) != "hit":
+            break
+        value = draw()
+        player_total += value
+        if value == 11:
+            player_aces += 1
+        if player_total > 21 and player_aces:
+            player_total -= 10
+            player_aces -= 1
+
+    # the dealer plays out the hand even when the player has busted, as in play_game
+    while dealer_total < rules.dealer_stands_on:
+        value = draw()
+        dealer_total += value
+        if value == 11:
+            dealer_aces += 1
+        if dealer_total > 21 and dealer_aces:
+            dealer_total -= 10
+            dealer_aces -= 1
+
+    if player_total > 21:
+        return 0.0, False, player_total, dealer_total
+    if dealer_total > 21 or player_total > dealer_total:
+        return rules.win_payout, False, player_total, dealer_total
+    if player_total < dealer_total:
+        return 0.0, False, player_total, dealer_total
+    return rules.push_payout, False, player_total, dealer_total
+
+
+def simulate(
+    n_rounds: int,
+    strategy: Strategy = mimic_dealer,
+    rules: Rules = HOUSE_RULES,
+    seed: Optional[int] = None,
+) -> SimulationResult:
+    """
+    Simulate rounds of blackjack headlessly and tally the results.
+
+    Args:
+        n_rounds (int): Number of rounds to play.
+        strategy (Strategy, optional): The player's hit/stand policy. Defaults to mimic_dealer.
+        rules (Rules, optional): The table rules. Defaults to the house rules of the game.
+        seed (int, optional): Seed for the shuffle so runs can be reproduced.
+
+    Returns:
+        SimulationResult: The aggregate outcome of all rounds.
+    """
+    shoe = Shoe(rules.num_decks, rules.penetration, random.Random(seed))
+    deal = shoe.deal
+
+    def draw() -> int:
+        return CARD_VALUES[deal()]
+
+    result = SimulationResult()
+    start = time.perf_counter()
+    shoe.shuffle()
+    for _ in range(n_rounds):
+        if shoe.needs_reshuffle:
+            shoe.shuffle()
+        payout, natural, _, _ = play_round(draw, strategy, rules)
+        result.net_units += payout - 1
+        if payout > 1:
+            result.wins += 1
+            result.blackjacks += natural
+        elif payout == 1:
+            result.ties += 1
+        else:
+            result.losses += 1
+    result.elapsed = time.perf_counter() - start
+    result.rounds = n_rounds
+    return result
+
+
+def simulate_rounds(
+    n_rounds: int,
+    strategy: Strategy = mimic_dealer,
+    rules: Rules = HOUSE_RULES,
+    seed: Optional[int] = None,
+) -> Iterator[Tuple[float, int, int]]:
+    """
+    Play rounds like simulate, yielding each one instead of tallying it.
+
+    Yields:
+        Tuple[float, int, int]: The amount returned per unit bet and the final player
+            and dealer totals of every round, in order.
+    """
+    shoe = Shoe(rules.num_decks, rules.penetration, random.Random(seed))
+    deal = shoe.deal
+
+    def draw() -> int:
+        return CARD_VALUES[deal()]
+
+    shoe.shuffle()
+    for _ in range(n_rounds):
+        if shoe.needs_reshuffle:
+            shoe.shuffle()
+        payout, _, player_total, dealer_total = play_round(draw, strategy, rules)
+        yield payout, player_total, dealer_total
+
+
+def shard_seeds(master_seed: Optional[int], n_shards: int) -> List[int]:
+    """Derive one independent 64-bit seed per shard from a master seed."""
+    rng = random.Random(master_seed)
+    return [rng.getrandbits(64) for _ in range(n_shards)]
+
+
+def _run_shard(args: Tuple[int, Strategy, Rules, int]) -> SimulationResult:
+    n_rounds, strategy, rules, seed = args
+    return simulate(n_rounds, strategy, rules, seed)
+
+
+def simulate_parallel(
+    n_rounds: int,
+    strategy: Strategy = mimic_dealer,
+    rules: Rules = HOUSE_RULES,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> SimulationResult:
+    """
+    Simulate rounds across a process pool, one shard per worker.
+
+    Every shard owns its shoe and a random.Random seeded from the master seed, so the
+    same (seed, workers) pair always produces the same totals. Each worker sends back a
+    single SimulationResult, which the parent folds into a running total.
+
+    Args:
+        n_rounds (int): Total number of rounds to play across all workers.
+        strategy (Strategy, optional): A module-level (picklable) hit/stand policy.
+        rules (Rules, optional): The table rules.
+        seed (int, optional): Master seed the per-shard seeds are derived from.
+        workers (int, optional): Number of worker processes. Defaults to the CPU count.
+
+    Returns:
+        SimulationResult: The merged outcome; elapsed is the wall-clock time of the run.
+    """
+    workers = workers or os.cpu_count() or 1
+    base, extra = divmod(n_rounds, workers)
+    shards = [
+        (base + (i < extra), strategy, rules, shard_seed)
+        for i, shard_seed in enumerate(shard_seeds(seed, workers))
+    ]
+
+    result = SimulationResult()
+    start = time.perf_counter()
+    if workers == 1:
+        result.merge(_run_shard(shards[0]))
+    else:
+        with Pool(workers) as pool:
+            for shard_result in pool.imap_unordered(_run_shard, shards):
+                result.merge(shard_result)
+    result.elapsed = time.perf_counter() - start
+    return result
@@ -0,0 +1,189 @@
+# local basic-strategy engine: answers "help" without a network round trip
+#
+# The tables are derived from the expected value of every action against an
+# infinite deck (each rank equally likely, tens four times as likely), computed once
+# per rule set, cached on disk as JSON and reloaded on later runs.
+import hashlib
+import json
+import os
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from rules import HOUSE_RULES, Rules
+
+STRATEGY_CACHE_DIR = os.getenv(
+    "BLACKJACK_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+)
+TABLE_FORMAT_VERSION = 1
+
+# probability of drawing each card value from an infinite deck
+CARD_PROBABILITIES = {value: (4 if value == 10 else 1) / 13 for value in range(2, 12)}
+UPCARDS = tuple(range(2, 12))
+
+# (player total, soft?, pair card value or 0, dealer upcard value)
+StrategyKey = Tuple[int, bool, int, int]
+# (best action on the first two cards, best action once only hit/stand remain)
+StrategyEntry = Tuple[str, str]
+
+
+def _add_card(total: int, soft: bool, value: int) -> Tuple[int, bool]:
+    """Add a card value to a (total, soft) state, demoting a soft Ace when it would bust."""
+    if value == 11 and soft:
+        value = 1  # at most one Ace can count as 11
+    total += value
+    soft = soft or value == 11
+    if total > 21 and soft:
+        total -= 10
+        soft = False
+    return total, soft
+
+
+def dealer_final_distribution(upcard: int, rules: Rules = HOUSE_RULES) -> Dict[int, float]:
+    """
+    Probability of each final dealer total given the upcard, against an infinite deck.
+
+    Returns:
+        Dict[int, float]: Final totals mapped to their probability; 22 stands for a bust.
+    """
+    @lru_cache(maxsize=None)
+    def finish(total: int, soft: bool) -> Tuple[Tuple[int, float], ...]:
+        if total > 21:
+            return ((22, 1.0),)
+        if total >= rules.dealer_stands_on:
+            return ((total, 1.0),)
+        outcome: Dict[int, float] = {}
+        for value, probability in CARD_PROBABILITIES.items():
+            for final, final_probability in finish(*_add_card(total, soft, value)):
+                outcome[final] = outcome.get(final, 0.0) + probability * final_probability
+        return tuple(outcome.items())
+
+    return dict(finish(upcard, upcard == 11))
+
+
+def compute_action_values(upcard: int, rules: Rules = HOUSE_RULES):
+    """
+    Build the expected-value functions of every player action against one upcard.
+
+    Returns:
+        Tuple of callables (stand, hit, double, split) taking the player state and
+        returning the expected net units per unit bet.
+    """
+    dealer = dealer_final_distribution(upcard, rules)
+    win = rules.win_payout - 1
+    push = rules.push_payout - 1
+
+    @lru_cache(maxsize=None)
+    def stand(total: int) -> float:
+        if total > 21:
+            return -1.0
+        ev = 0.0
+        for final, probability in dealer.items():
+            if final > 21 or final < total:
+                ev += probability * win
+            elif final == total:
+                ev += probability * push
+            else:
+                ev -= probability
+        return ev
+
+    @lru_cache(maxsize=None)
+    def hit(total: int, soft: bool) -> float:
+        ev = 0.0
+        for value, probability in CARD_PROBABILITIES.items():
+            new_total, new_soft = _add_card(total, soft, value)
+            if new_total > 21:
+                ev -= probability
+            else:
+                ev += probability * max(stand(new_total), hit(new_total, new_soft))
+        return ev
+
+    def double(total: int, soft: bool) -> float:
+        return 2 * sum(
+            probability * stand(_add_card(total, soft, value)[0])
+            for value, probability in CARD_PROBABILITIES.items()
+        )
+
+    def split(pair: int) -> float:
+        # one split only; split Aces receive a single card each
+        ev = 0.0
+        for value, probability in CARD_PROBABILITIES.items():
+            total, soft = _add_card(pair, pair == 11, value)
+            if pair == 11:
+                ev += probability * stand(total)
+            else:
+                ev += probability * max(stand(total), hit(total, soft))
+        return 2 * ev
+
+    return stand, hit, double, split
+
+
+def compute_strategy_table(rules: Rules = HOUSE_RULES) -> Dict[StrategyKey, StrategyEntry]:
+    """Compute the full basic-strategy table for a rule set."""
+    table: Dict[StrategyKey, StrategyEntry] = {}
+    for upcard in UPCARDS:
+        stand, hit, double, split = compute_action_values(upcard, rules)
+
+        def best(total: int, soft: bool, pair: int) -> StrategyEntry:
+            later = {"stand": stand(total), "hit": hit(total, soft)}
+            initial = dict(later)
+            if rules.double_allowed:
+                initial["double"] = double(total, soft)
+            if rules.surrender_allowed:
+                initial["surrender"] = -0.5
+            if pair and rules.split_allowed:
+                initial["split"] = split(pair)
+            return max(initial, key=initial.get), max(later, key=later.get)
+
+        for total in range(4, 22):
+            table[(total, False, 0, upcard)] = best(total, False, 0)
+        for total in range(12, 22):
+            table[(total, True, 0, upcard)] = best(total, True, 0)
+        for pair in range(2, 12):
+            total, soft = _add_card(pair, pair == 11, pair)
+            table[(total, soft, pair, upcard)] = best(total, soft, pair)
+    return table
+
+
+def strategy_cache_path(rules: Rules) -> str:
+    """Path of the on-disk table for a rule set."""
+    digest = hashlib.sha1(repr(tuple(rules)).encode()).hexdigest()[:16]
+    return os.path.join(STRATEGY_CACHE_DIR, f"strategy-v{TABLE_FORMAT_VERSION}-{digest}.json")
+
+
+def save_strategy_table(table: Dict[StrategyKey, StrategyEntry], path: str) -> None:
+    """Write a table to disk atomically so a crash never leaves a half-written cache."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    rows = [[total, soft, pair, upcard, initial, later]
+            for (total, soft, pair, upcard), (initial, later) in table.items()]
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as cache_file:
+        json.dump(rows, cache_file)
+    os.replace(temp_path, path)
+
+
+def load_strategy_table(path: str) -> Dict[StrategyKey, StrategyEntry]:
+    """Read a table written by save_strategy_table."""
+    with open(path) as cache_file:
+        rows = json.load(cache_file)
+    return {(total, soft, pair, upcard): (initial, later)
+            for total, soft, pair, upcard, initial, later in rows}
+
+
+@lru_cache(maxsize=None)
+def get_strategy_table(rules: Rules = HOUSE_RULES) -> Dict[StrategyKey, StrategyEntry]:
+    """Return the table for a rule set, loading it from disk or computing and caching it."""
+    path = strategy_cache_path(rules)
+    try:
+        return load_strategy_table(path)
+    except (OSError, ValueError):
+        table = compute_strategy_table(rules)
+        try:
+            save_strategy_table(table, path)
+        except OSError:
+            pass
+        return table
+
+
+def basic_strategy(total: int, soft: bool, upcard: int) -> str:
+    """Hit/stand basic strategy for the house rules, usable as a simulator strategy."""
+    return get_strategy_table(HOUSE_RULES)[(total, soft, 0, upcard)][1] if total < 21 else "stand"
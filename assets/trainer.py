@@ -1,47 +1,40 @@
 import os
 import random
+import sys
+from typing import List
 from rich.console import Console
 from rich.table import Table
 from sqlalchemy.orm import sessionmaker
-from models import Player, get_db_engine, init_db
+from cards import CARD_NAMES, HI_LO_TAGS, hand_value
+from models import Player, get_configured_db_engine, init_db
+from shoe import Shoe
 
 console = Console()
 
-def create_deck(num_decks: int) -> list:
-    """Create a new shuffled deck with the specified number of decks."""
-    suits = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
-    ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen', 'King', 'Ace']
-    deck = [{'suit': suit, 'rank': rank} for _ in range(num_decks) for suit in suits for rank in ranks]
-    random.shuffle(deck)
+def create_deck(num_decks: int, seed: int = None) -> Shoe:
+    """Create a new shuffled shoe with the specified number of decks, seeded to repeat a session."""
+    deck = Shoe(num_decks, penetration=0.75, rng=random.Random(seed))
+    deck.shuffle()
     return deck
 
-def deal_card(deck: list) -> dict:
-    """Deal a single card from the deck."""
-    return deck.pop()
+def deal_card(deck: Shoe) -> int:
+    """Deal a single card from the shoe."""
+    return deck.deal()
 
-def display_card(card: dict, hide: bool = False) -> None:
+def display_card(card: int, hide: bool = False) -> None:
     """Display a single card."""
     if hide:
         console.print("[bold white]XX[/bold white]")
     else:
-        console.print(f"[bold white]{card['rank']} of {card['suit']}[/bold white]")
+        console.print(f"[bold white]{CARD_NAMES[card]}[/bold white]")
 
 def get_hand_value(hand: list) -> int:
     """Calculate the value of a hand."""
-    value = sum(10 if card['rank'] in ['10', 'Jack', 'Queen', 'King'] else 11 if card['rank'] == 'Ace' else int(card['rank']) for card in hand)
-    num_aces = sum(card['rank'] == 'Ace' for card in hand)
-    while value > 21 and num_aces > 0:
-        value -= 10
-        num_aces -= 1
-    return value
-
-def update_count(card: dict, count: int) -> int:
+    return hand_value(hand)
+
+def update_count(card: int, count: int) -> int:
     """Update the running count based on the dealt card."""
-    if card['rank'] in ['2', '3', '4', '5', '6']:
-        count += 1
-    elif card['rank'] in ['10', 'Jack', 'Queen', 'King', 'Ace']:
-        count -= 1
-    return count
+    return count + HI_LO_TAGS[card]
 
 def get_true_count(count: int, remaining_decks: float) -> float:
     """Calculate the true count based on the running count and remaining decks."""
@@ -55,8 +48,16 @@ def get_user_input(prompt: str) -> str:
             return user_input
         console.print("Invalid input. Please try again.", style="bold red")
 
-def play_round(deck: list, num_decks: int) -> tuple:
-    """Play a single round of card counting training."""
+def get_count_input(prompt: str) -> int:
+    """Ask for a running count until a whole number is given."""
+    while True:
+        try:
+            return int(get_user_input(prompt))
+        except ValueError:
+            console.print("Please enter a whole number, e.g. -2.", style="bold red")
+
+def play_round(deck: Shoe, num_decks: int, answer: int = None) -> tuple:
+    """Play a single round of card counting training; answer is the running count given, asked for when None."""
     player_hand = []
     dealer_hand = []
     count = 0
@@ -80,10 +81,14 @@ def play_round(deck: list, num_decks: int) -> tuple:
         display_card(card)
 
     # Prompt user for running count
-    remaining_decks = len(deck) / 52
+    remaining_decks = deck.remaining_decks
     true_count = get_true_count(count, remaining_decks)
 
-    user_count = int(get_user_input("Enter the running count: "))
+    if answer is None:
+        user_count = get_count_input("Enter the running count: ")
+    else:
+        user_count = answer
+        console.print(f"Enter the running count: {answer}")
     if user_count == count:
         console.print("Correct count!", style="bold green")
     else:
@@ -100,27 +105,50 @@ def play_round(deck: list, num_decks: int) -> tuple:
 
     return count, true_count
 
-def play_game(session, player: Player, num_decks: int) -> None:
-    """Play multiple rounds of card counting training."""
-    deck = create_deck(num_decks)
+def play_game(session, player: Player, num_decks: int, rounds: int = None, seed: int = None,
+              counts: List[int] = None, interactive: bool = True) -> None:
+    """
+    Play rounds of card counting training until the player quits or, if given, for a number of rounds.
+
+    counts answers the running count of each round in turn, and rounds defaults to their
+    number. When not interactive (stdin is not a terminal) nobody is asked whether to
+    continue, and training stops when the input runs out.
+    """
+    if counts is not None and rounds is None:
+        rounds = len(counts)
+    deck = create_deck(num_decks, seed)
     num_rounds = 0
     total_count = 0
     total_true_count = 0
 
     while True:
-        if len(deck) < num_decks * 52 * 0.25:  # Reshuffle when 75% of cards are dealt
-            deck = create_deck(num_decks)
+        if deck.needs_reshuffle:  # Reshuffle once the cut card (75% of the shoe) comes out
+            deck.shuffle()
             console.print("\nReshuffling the deck...", style="bold blue")
 
-        count, true_count = play_round(deck, num_decks)
+        answer = counts[num_rounds] if counts is not None else None
+        try:
+            count, true_count = play_round(deck, num_decks, answer)
+        except EOFError:
+            console.print("\nInput ended.", style="bold red")
+            break
         num_rounds += 1
         total_count += count
         total_true_count += true_count
 
+        if rounds is not None:
+            if num_rounds >= rounds:
+                break
+            continue
+        if not interactive:
+            continue
         play_again = get_user_input("\nPress Enter to continue or type 'quit' to exit: ")
         if play_again.lower() == "quit":
             break
 
+    if not num_rounds:
+        console.print("No rounds played.")
+        return
     avg_count = total_count / num_rounds
     avg_true_count = total_true_count / num_rounds
 
@@ -129,23 +157,23 @@ def play_game(session, player: Player, num_decks: int) -> None:
     console.print(f"Average running count: {avg_count:.2f}")
     console.print(f"Average true count: {avg_true_count:.2f}")
 
-def main() -> None:
-    """Main program entry point."""
-    db_url = "sqlite:///blackjack.db"
-    engine = get_db_engine(db_url)
+def main(player_name: str = None, num_decks: int = None, rounds: int = None, seed: int = None,
+         counts: List[int] = None) -> None:
+    """Main program entry point; the player and the number of decks are asked for unless given."""
+    engine = get_configured_db_engine()
     init_db(engine)
     Session = sessionmaker(bind=engine)
 
     with Session() as session:
-        player_name = get_user_input("Enter your name: ")
+        player_name = player_name or get_user_input("Enter your name: ")
         player = session.query(Player).filter_by(name=player_name).first()
         if not player:
             player = Player(name=player_name)
             session.add(player)
             session.commit()
 
-        num_decks = int(get_user_input("Enter the number of decks to use (1-8): "))
-        play_game(session, player, num_decks)
+        num_decks = num_decks or int(get_user_input("Enter the number of decks to use (1-8): "))
+        play_game(session, player, num_decks, rounds, seed, counts, sys.stdin.isatty())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
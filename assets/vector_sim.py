@@ -0,0 +1,191 @@
+# vectorized batch evaluation of blackjack rounds with NumPy
+#
+# Every row of a batch is one round dealt from its own freshly shuffled shoe. Hands,
+# the dealer's draw-to-17 and payouts are all computed as whole-array operations, and
+# the player's decisions come from a boolean hit table built from any simulator
+# strategy, so each row resolves exactly as simulator.play_round would on that shoe.
+import time
+from typing import Optional
+
+import numpy as np
+
+from dealer_odds import full_composition
+from rules import HOUSE_RULES, Rules
+from simulator import SimulationResult, Strategy, mimic_dealer
+
+DEFAULT_BATCH_SIZE = 100000
+
+
+def hit_table(strategy: Strategy) -> np.ndarray:
+    """Tabulate a strategy as hit[total, soft, upcard] so whole batches can be looked up at once."""
+    table = np.zeros((32, 2, 12), dtype=bool)
+    for total in range(4, 21):
+        # a soft hand is always worth at least 12
+        for soft in (False, True) if total >= 12 else (False,):
+            for upcard in range(2, 12):
+                table[total, int(soft), upcard] = strategy(total, soft, upcard) == "hit"
+    return table
+
+
+class _BatchShoe:
+    """A (batch, cards) array of shoe values, each row dealt from the front."""
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        self.rows = np.arange(values.shape[0])
+        self.position = np.zeros(values.shape[0], dtype=np.intp)
+
+    def deal(self, mask: np.ndarray) -> np.ndarray:
+        """Deal one card to every masked row; unmasked rows get a 0 and keep their position."""
+        if int(self.position[mask].max(initial=0)) >= self.values.shape[1]:
+            raise ValueError("A round ran out of cards; use a bigger shoe")
+        cards = np.where(mask, self.values[self.rows, np.minimum(self.position, self.values.shape[1] - 1)], 0)
+        self.position += mask
+        return cards
+
+
+class _ShuffledBatchShoe:
+    """
+    A batch of freshly shuffled shoes that are only ever drawn as far as they are dealt.
+
+    Each row keeps the counts of its undealt card values; dealing takes a uniformly
+    random card from those counts, which is the same as reading the next card of a fully
+    shuffled shoe, but costs nothing for the cards no round reaches. Work is done only
+    for the rows being dealt to.
+    """
+
+    def __init__(self, batch: int, composition: np.ndarray, rng: np.random.Generator):
+        self.rng = rng
+        self.rows = np.arange(batch)
+        # one row per card value so each count is a contiguous vector over the batch
+        self.counts = np.repeat(composition.astype(np.int16)[:, None], batch, axis=1)
+        self.remaining = np.full(batch, int(composition.sum()), dtype=np.int16)
+
+    def deal(self, mask: np.ndarray) -> np.ndarray:
+        """Deal one card to every masked row; unmasked rows get a 0."""
+        if mask.all():
+            rows, remaining, counts = self.rows, self.remaining, self.counts
+        else:
+            rows = np.flatnonzero(mask)
+            remaining, counts = self.remaining[rows], self.counts[:, rows]
+        if not remaining.all():
+            raise ValueError("A round ran out of cards; use a bigger shoe")
+        pick = (self.rng.random(len(rows), dtype=np.float32) * remaining).astype(np.int16)
+        np.minimum(pick, remaining - 1, out=pick)  # float32 rounding can land on remaining itself
+        running = np.zeros(len(rows), dtype=np.int16)
+        category = np.zeros(len(rows), dtype=np.int16)
+        for count in counts[:-1]:
+            running += count
+            category += running <= pick
+        self.counts[category, rows] -= 1
+        self.remaining[rows] -= 1
+        cards = np.zeros(len(self.rows), dtype=np.int16)
+        cards[rows] = category + 2
+        return cards
+
+
+def _add(total: np.ndarray, aces: np.ndarray, cards: np.ndarray) -> None:
+    """Add a card value (0 for no card) to every hand, demoting a soft Ace on a bust."""
+    total += cards
+    aces += cards == 11
+    demote = (total > 21) & (aces > 0)
+    total -= 10 * demote
+    aces -= demote
+
+
+def evaluate_batch(shoe, table: np.ndarray, rules: Rules = HOUSE_RULES) -> np.ndarray:
+    """
+    Resolve one round per row and return the amount returned per unit bet.
+
+    Args:
+        shoe (_BatchShoe or _ShuffledBatchShoe): The batch of shoes to deal from, see
+            evaluate_shoes and simulate_vectorized.
+        table (np.ndarray): The player's hit table, see hit_table.
+        rules (Rules, optional): The table rules.
+
+    Returns:
+        np.ndarray: Payout per row (0, push, win or blackjack payout). Naturals are the
+            rows equal to rules.blackjack_payout.
+    """
+    batch = len(shoe.rows)
+    everyone = np.ones(batch, dtype=bool)
+
+    player_total = np.zeros(batch, dtype=np.int16)
+    player_aces = np.zeros(batch, dtype=np.int16)
+    dealer_total = np.zeros(batch, dtype=np.int16)
+    dealer_aces = np.zeros(batch, dtype=np.int16)
+    _add(player_total, player_aces, shoe.deal(everyone))
+    _add(player_total, player_aces, shoe.deal(everyone))
+    upcard = shoe.deal(everyone)
+    _add(dealer_total, dealer_aces, upcard)
+    _add(dealer_total, dealer_aces, shoe.deal(everyone))
+
+    natural = (player_total == 21) & (dealer_total < 21)
+    playing = ~natural
+    while True:
+        hitting = playing & (player_total < 21)
+        hitting &= table[np.minimum(player_total, 31), (player_aces > 0).astype(np.intp), upcard]
+        if not hitting.any():
+            break
+        _add(player_total, player_aces, shoe.deal(hitting))
+        playing = hitting
+
+    while True:
+        # the dealer plays out the hand even when the player has busted, as in play_game
+        drawing = ~natural & (dealer_total < rules.dealer_stands_on)
+        if not drawing.any():
+            break
+        _add(dealer_total, dealer_aces, shoe.deal(drawing))
+
+    payout = np.zeros(batch, dtype=np.float64)
+    alive = player_total <= 21
+    payout[alive & ((dealer_total > 21) | (player_total > dealer_total))] = rules.win_payout
+    payout[alive & (dealer_total <= 21) & (player_total == dealer_total)] = rules.push_payout
+    payout[natural] = rules.blackjack_payout
+    return payout
+
+
+def evaluate_shoes(shoe_values: np.ndarray, table: np.ndarray, rules: Rules = HOUSE_RULES) -> np.ndarray:
+    """Resolve one round per row of explicit (batch, cards) card values, dealt from the front."""
+    return evaluate_batch(_BatchShoe(shoe_values), table, rules)
+
+
+def simulate_vectorized(
+    n_rounds: int,
+    strategy: Strategy = mimic_dealer,
+    rules: Rules = HOUSE_RULES,
+    seed: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> SimulationResult:
+    """
+    Simulate rounds in NumPy batches, each round dealt from a freshly shuffled shoe.
+
+    Args:
+        n_rounds (int): Number of rounds to play.
+        strategy (Strategy, optional): The player's hit/stand policy.
+        rules (Rules, optional): The table rules.
+        seed (int, optional): Seed for reproducible runs.
+        batch_size (int, optional): Rounds resolved per batch.
+
+    Returns:
+        SimulationResult: The aggregate outcome of all rounds.
+    """
+    rng = np.random.default_rng(seed)
+    table = hit_table(strategy)
+    composition = np.array(full_composition(rules.num_decks))
+
+    result = SimulationResult()
+    start = time.perf_counter()
+    for first in range(0, n_rounds, batch_size):
+        size = min(batch_size, n_rounds - first)
+        payout = evaluate_batch(_ShuffledBatchShoe(size, composition, rng), table, rules)
+        result.merge(SimulationResult(
+            rounds=size,
+            wins=int(np.count_nonzero(payout > 1)),
+            losses=int(np.count_nonzero(payout == 0)),
+            ties=int(np.count_nonzero(payout == 1)),
+            blackjacks=int(np.count_nonzero(payout == rules.blackjack_payout)),
+            net_units=float(payout.sum()) - size,
+        ))
+    result.elapsed = time.perf_counter() - start
+    return result
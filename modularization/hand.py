@@ -1,16 +1,26 @@
 from config import VALUES
 
 class Hand:
+    __slots__ = ("cards", "value", "soft_aces", "is_bust", "is_blackjack")
+
     def __init__(self):
         self.cards = []
+        self.value = 0
+        self.soft_aces = 0
+        self.is_bust = False
+        self.is_blackjack = False
         
     def add_card(self, card):
         self.cards.append(card)
+        value = self.value + VALUES[card["rank"]]
+        soft_aces = self.soft_aces + (card["rank"] == "Ace")
+        while value > 21 and soft_aces:
+            value -= 10
+            soft_aces -= 1
+        self.value = value
+        self.soft_aces = soft_aces
+        self.is_bust = value > 21
+        self.is_blackjack = value == 21 and len(self.cards) == 2
         
     def calculate_value(self):
-        value = sum(VALUES[card["rank"]] for card in self.cards)
-        aces = sum(card["rank"] == "Ace" for card in self.cards)
-        while value > 21 and aces:
-            value -= 10
-            aces -= 1
-        return value
\ No newline at end of file
+        return self.value
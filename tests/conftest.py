@@ -0,0 +1,9 @@
+# the game's modules live in assets/ and import each other by name
+import os
+import sys
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+sys.path.insert(0, ASSETS_DIR)
+# no sounds and no real database while testing
+os.environ.setdefault("BLACKJACK_AUDIO", "null")
+os.environ.setdefault("BLACKJACK_DB_URL", "sqlite://")
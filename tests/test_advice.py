@@ -0,0 +1,90 @@
+# AdviceClient against a local stub of the completions API
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import advice
+from advice import AdviceClient, AdviceKey, local_advice, openai_completion
+
+pytest.importorskip("openai")
+
+KEY = AdviceKey(16, False, 10, 0)
+
+
+class StubCompletions(BaseHTTPRequestHandler):
+    """Answers completion requests after delay seconds, or with an error status."""
+    delay = 0.0
+    status = 200
+    requests = 0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        type(self).requests += 1
+        time.sleep(self.delay)
+        if self.status != 200:
+            data = json.dumps({"error": {"message": "stub failure", "type": "server_error"}}).encode()
+        else:
+            data = json.dumps({
+                "id": "stub", "object": "text_completion", "created": 0, "model": body["model"],
+                "choices": [{"text": f" stub answer {type(self).requests}", "index": 0, "finish_reason": "stop"}],
+            }).encode()
+        self.send_response(self.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """A stub server on a free port, with openai pointed at it."""
+    handler = type("Handler", (StubCompletions,), {"delay": 0.0, "status": 200, "requests": 0})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-stub")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    advice._openai_client.cache_clear()
+    yield handler
+    advice._openai_client.cache_clear()
+    server.shutdown()
+    server.server_close()
+
+
+def test_prefetched_answer_is_fetched_once(stub):
+    client = AdviceClient(openai_completion, timeout=5.0)
+    client.prefetch(KEY)
+    client.prefetch(KEY)
+    assert client.get(KEY) == ("stub answer 1", "api")
+    assert client.get(KEY) == ("stub answer 1", "cache")
+    assert stub.requests == 1
+    assert client.stats.lookups == 2
+    assert client.stats.memory_hits == 1
+
+
+def test_slow_answer_falls_back_at_the_deadline_and_fills_the_cache_late(stub):
+    stub.delay = 0.5
+    client = AdviceClient(openai_completion, timeout=0.1)
+    start = time.perf_counter()
+    assert client.get(KEY) == (local_advice(KEY), "local")
+    assert time.perf_counter() - start < 0.4
+    assert client.stats.fallbacks == 1
+
+    deadline = time.monotonic() + 5
+    while client._pending and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert client.get(KEY) == ("stub answer 1", "api")
+    assert stub.requests == 1
+
+
+def test_failed_request_falls_back_to_local_advice(stub):
+    stub.status = 500
+    client = AdviceClient(openai_completion, timeout=5.0)
+    assert client.get(KEY) == (local_advice(KEY), "local")
+    assert client.stats.errors == 1
+    assert client.stats.fallbacks == 1
@@ -0,0 +1,58 @@
+# the sound cues of a round, captured by the recording audio backend
+import random
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import blackjack
+import play_sound
+from models import get_db_engine, init_db
+from play_sound import RecordingAudioBackend
+from simulator import always_stand, mimic_dealer
+
+CARD_DRAW = "card-sounds-35956.wav"
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    """The backend BLACKJACK_AUDIO=recording selects, installed for one test."""
+    monkeypatch.setenv("BLACKJACK_AUDIO", "recording")
+    monkeypatch.setattr(play_sound, "_backend", None)
+    backend = play_sound.get_audio_backend()
+    assert isinstance(backend, RecordingAudioBackend)
+    return backend
+
+
+@pytest.fixture
+def session():
+    engine = get_db_engine("sqlite://", "memory")
+    init_db(engine)
+    with sessionmaker(bind=engine, expire_on_commit=False)() as session:
+        yield session
+
+
+def expected_cues(result):
+    """The cues play_game fires for a round, worked out from its result."""
+    cues = ["coin_sound.wav"] + [CARD_DRAW] * 4
+    if result.outcome == "Win" and result.payout == blackjack.BLACKJACK_PAYOUT * result.bet:
+        return cues + ["blackjack_cheer.wav"]
+    cues += [CARD_DRAW] * (len(result.player_hand) - 2 + len(result.dealer_hand) - 2)
+    cues.append("success-1-6297.wav" if result.outcome == "Win" else "game_loss.wav")
+    return cues + ["play_again.wav"]
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("strategy", [always_stand, mimic_dealer])
+def test_play_game_fires_the_cues_of_the_round(recorded, session, seed, strategy):
+    player = blackjack.get_or_create_player(session, "cues")
+    deck = blackjack.create_deck(1, rng=random.Random(seed))
+    deck.shuffle()
+    result = blackjack.play_game(
+        session, player, deck, {"count": 0}, bet=5, strategy=strategy, interactive=False
+    )
+    assert recorded.played == expected_cues(result)
+
+
+def test_shuffle_deck_fires_the_shuffle_cue(recorded):
+    blackjack.shuffle_deck(blackjack.create_deck(1))
+    assert recorded.played == ["shuffle-cards-46455.wav"]
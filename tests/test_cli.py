@@ -0,0 +1,78 @@
+# the subcommands run from scripts, with no terminal on stdin
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ASSETS_DIR
+
+BLACKJACK = os.path.join(ASSETS_DIR, "blackjack.py")
+
+
+def run(tmp_path, *args, stdin_text=""):
+    env = dict(os.environ, BLACKJACK_DB_URL=f"sqlite:///{tmp_path / 'blackjack.db'}", BLACKJACK_AUDIO="null")
+    return subprocess.run(
+        [sys.executable, BLACKJACK, *args], input=stdin_text, capture_output=True, text=True,
+        env=env, cwd=tmp_path, timeout=120,
+    )
+
+
+def test_play_without_input_ends_cleanly(tmp_path):
+    result = run(tmp_path, "play", "-p", "bob", "-n", "2", "--seed", "1")
+    assert result.returncode == 0
+    assert "Traceback" not in result.stderr
+    assert "0 rounds played" in result.stdout
+
+
+def test_play_with_bet_and_strategy_needs_no_input(tmp_path):
+    result = run(tmp_path, "play", "-p", "bob", "-n", "3", "--seed", "1", "--bet", "5", "--strategy", "basic")
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.count("Betting 5.") == 3
+    assert "3 rounds played" in result.stdout
+
+    stats = run(tmp_path, "stats", "-p", "bob", "--format", "csv")
+    assert stats.stdout.splitlines()[1].split(",")[2] == "3"
+
+
+def test_play_reads_piped_answers_until_they_run_out(tmp_path):
+    result = run(tmp_path, "play", "-p", "carol", "--seed", "2", stdin_text="5\nstand\n")
+    assert result.returncode == 0, result.stderr
+    assert "1 rounds played" in result.stdout
+
+
+def test_train_with_counts_needs_no_input(tmp_path):
+    result = run(tmp_path, "train", "-p", "bob", "-d", "2", "--counts", "1,0,-2", "--seed", "4")
+    assert result.returncode == 0, result.stderr
+    assert "Number of rounds played: 3" in result.stdout
+
+
+def test_train_without_input_exits_without_a_traceback(tmp_path):
+    result = run(tmp_path, "train", "-p", "bob", "-n", "2", "--seed", "1")
+    assert result.returncode == 1
+    assert "Traceback" not in result.stderr
+    assert "Input ended." in result.stdout
+
+
+@pytest.mark.parametrize("args", [
+    ["play", "-d", "9"],
+    ["train", "-d", "0"],
+    ["simulate", "-d", "9"],
+    ["simulate-count", "-d", "0"],
+    ["view", "-n", "-1"],
+    ["play", "-n", "0"],
+    ["simulate", "--batch-size", "0"],
+    ["simulate-count", "-p", "1.5"],
+])
+def test_out_of_range_flags_are_usage_errors(tmp_path, args):
+    result = run(tmp_path, *args)
+    assert result.returncode == 2
+    assert "Traceback" not in result.stderr
+    assert "error: argument" in result.stderr
+
+
+def test_unknown_player_is_reported(tmp_path):
+    for command in ("view", "replay"):
+        result = run(tmp_path, command, "-p", "nobody")
+        assert result.returncode == 0, result.stderr
+        assert "No player named nobody." in result.stdout
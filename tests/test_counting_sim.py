@@ -0,0 +1,17 @@
+# the hi-lo bet-ramp simulator, including shoes dealt to the last card
+import pytest
+
+from cards import CARDS_PER_DECK
+from counting_sim import simulate_counting
+from rules import HOUSE_RULES
+
+
+@pytest.mark.parametrize("penetration", [0.5, 0.75, 1.0])
+def test_plays_the_requested_number_of_shoes(penetration):
+    rules = HOUSE_RULES._replace(num_decks=2, penetration=penetration)
+    result = simulate_counting(50, rules=rules, seed=1)
+    assert result.shoes == 50
+    # a round takes at least four cards, and a shoe is not dealt past its cut card
+    cards_per_shoe = 2 * CARDS_PER_DECK * penetration
+    assert 50 * cards_per_shoe / 12 < result.rounds < 50 * cards_per_shoe / 4 + 50
+
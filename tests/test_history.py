@@ -0,0 +1,94 @@
+# the SQL summaries of history.py against the same totals worked out in Python
+import itertools
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from history import outcome_summary, streak_summary
+from models import GameSession, Player, get_db_engine, init_db
+
+START = datetime(2024, 1, 1)
+OUTCOMES = ["Win", "Loss", "Tie"]
+
+
+@pytest.fixture
+def games():
+    """A session holding random games of four players, interleaved, some without a bet."""
+    engine = get_db_engine("sqlite://", "memory")
+    init_db(engine)
+    rng = random.Random(7)
+    with sessionmaker(bind=engine)() as session:
+        players = [Player(name=f"player{i}", money_bag=100) for i in range(4)]
+        session.add_all(players)
+        session.flush()
+        # a streaky player makes long runs likely, the others alternate more often
+        weights = {players[0].id: [6, 1, 1]}
+        rows = []
+        for i in range(600):
+            player_id = rng.choice([player.id for player in players])
+            outcome = rng.choices(OUTCOMES, weights.get(player_id, [4, 4, 1]))[0]
+            bet = rng.choice([None, 5, 10])
+            payout = None if bet is None else {"Win": 2 * bet, "Loss": 0, "Tie": bet}[outcome]
+            rows.append(GameSession(
+                player_id=player_id, outcome=outcome, bet=bet, payout=payout,
+                timestamp=START + timedelta(hours=i),
+            ))
+        session.add_all(rows)
+        session.commit()
+        yield session, [
+            (row.id, row.player_id, row.outcome, row.bet, row.payout, row.timestamp) for row in rows
+        ]
+
+
+def brute_force_streaks(games):
+    """(longest win, longest loss, current) per player, walking each player's games in id order."""
+    streaks = {}
+    for player_id in {game[1] for game in games}:
+        outcomes = [game[2] for game in sorted(games) if game[1] == player_id]
+        runs = [(outcome, len(list(run))) for outcome, run in itertools.groupby(outcomes)]
+        longest = {
+            outcome: max((length for run_outcome, length in runs if run_outcome == outcome), default=0)
+            for outcome in ("Win", "Loss")
+        }
+        current_outcome, current_length = runs[-1]
+        streaks[player_id] = (longest["Win"], longest["Loss"], f"{current_outcome[0]}{current_length}")
+    return streaks
+
+
+def between(rows, since, until):
+    """The games played in [since, until), as history._filtered selects them."""
+    return [row for row in rows if (since is None or row[5] >= since) and (until is None or row[5] < until)]
+
+
+RANGES = [(None, None), (START + timedelta(hours=100), None), (None, START + timedelta(hours=450)),
+          (START + timedelta(hours=150), START + timedelta(hours=160))]
+
+
+@pytest.mark.parametrize("since, until", RANGES)
+def test_streak_summary_matches_brute_force(games, since, until):
+    session, rows = games
+    in_range = between(rows, since, until)
+    assert streak_summary(session, since=since, until=until) == brute_force_streaks(in_range)
+    for player_id, streaks in brute_force_streaks(in_range).items():
+        assert streak_summary(session, player_id, since, until) == {player_id: streaks}
+
+
+@pytest.mark.parametrize("since, until", RANGES)
+def test_outcome_summary_matches_brute_force(games, since, until):
+    session, rows = games
+    in_range = between(rows, since, until)
+    streaks = brute_force_streaks(in_range)
+    summaries = outcome_summary(session, since=since, until=until)
+    assert [summary.player_id for summary in summaries] == sorted(streaks)
+    for summary in summaries:
+        games_of_player = [row for row in in_range if row[1] == summary.player_id]
+        wins, losses, ties = (sum(row[2] == outcome for row in games_of_player) for outcome in OUTCOMES)
+        assert summary.name == session.get(Player, summary.player_id).name
+        assert (summary.games, summary.wins, summary.losses, summary.ties) == (
+            len(games_of_player), wins, losses, ties)
+        assert summary.net_hands == wins - losses
+        assert summary.net_money == sum(row[4] - row[3] for row in games_of_player if row[3] is not None)
+        assert (summary.longest_win_streak, summary.longest_loss_streak, summary.current_streak) == \
+            streaks[summary.player_id]
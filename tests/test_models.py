@@ -0,0 +1,46 @@
+# engines built from the configured database URL and profile
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from models import DB_PROFILES, get_configured_db_engine, init_db
+
+
+@pytest.mark.parametrize("url", ["sqlite://", "sqlite:///:memory:"])
+@pytest.mark.parametrize("profile", DB_PROFILES)
+def test_configured_engine_opens_in_memory_urls(monkeypatch, url, profile):
+    monkeypatch.setenv("BLACKJACK_DB_URL", url)
+    monkeypatch.setenv("BLACKJACK_DB_PROFILE", profile)
+    engine = get_configured_db_engine()
+    init_db(engine)
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO players (name, money_bag) VALUES ('amy', 100)"))
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM players")).scalar() == 1
+
+
+def test_performance_profile_shares_an_in_memory_database_between_threads(monkeypatch):
+    monkeypatch.setenv("BLACKJACK_DB_URL", "sqlite://")
+    monkeypatch.setenv("BLACKJACK_DB_PROFILE", "performance")
+    engine = get_configured_db_engine()
+    init_db(engine)
+    counts = []
+
+    def count_players():
+        with engine.connect() as connection:
+            counts.append(connection.execute(text("SELECT count(*) FROM players")).scalar())
+
+    thread = threading.Thread(target=count_players)
+    thread.start()
+    thread.join()
+    assert counts == [0]
+
+
+def test_performance_profile_uses_wal_for_files(monkeypatch, tmp_path):
+    monkeypatch.setenv("BLACKJACK_DB_URL", f"sqlite:///{tmp_path / 'blackjack.db'}")
+    monkeypatch.setenv("BLACKJACK_DB_PROFILE", "performance")
+    engine = get_configured_db_engine()
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+    engine.dispose()
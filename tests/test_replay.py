@@ -0,0 +1,65 @@
+# recorded rounds are dealt again from their shoe seed and checked against the record
+import random
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import blackjack
+from models import GameSession, get_db_engine, init_db
+from replay import replay_history
+from simulator import STRATEGIES
+
+ROUNDS = 60
+
+
+@pytest.fixture
+def session():
+    engine = get_db_engine("sqlite://", "memory")
+    init_db(engine)
+    with sessionmaker(bind=engine, expire_on_commit=False)() as session:
+        yield session
+
+
+def play_rounds(session, strategy_name, num_decks=6, seed=1):
+    """Play seeded rounds the way blackjack_game does and record each of them."""
+    player = blackjack.get_or_create_player(session, strategy_name)
+    deck = blackjack.create_deck(num_decks, rng=random.Random(seed))
+    deck.shuffle()
+    hi_lo_count = {"count": 0}
+    for _ in range(ROUNDS):
+        result = blackjack.play_game(
+            session, player, deck, hi_lo_count, bet=5, strategy=STRATEGIES[strategy_name], interactive=False
+        )
+        blackjack.record_game_session(
+            session, player.id, result.dealer_hand, result.player_hand, result.outcome,
+            bet=result.bet, payout=result.payout, true_count=result.true_count, actions=result.actions,
+            num_decks=deck.num_decks, shoe_seed=result.shoe_seed, shoe_position=result.shoe_position,
+        )
+    return player
+
+
+@pytest.mark.parametrize("strategy_name", sorted(STRATEGIES))
+def test_played_rounds_replay_to_their_record(session, strategy_name):
+    player = play_rounds(session, strategy_name)
+    report = replay_history(session, player.id)
+    assert report.sessions == ROUNDS
+    assert report.verified == ROUNDS
+    assert report.mismatches == []
+    assert report.skipped == 0
+    assert report.replayed_net == pytest.approx(report.recorded_net)
+
+
+def test_tampered_payout_and_outcome_are_reported(session):
+    play_rounds(session, "basic")
+    first, second = session.query(GameSession).order_by(GameSession.id).limit(2)
+    first.payout += 5
+    second.outcome = "Loss" if second.outcome != "Loss" else "Win"
+    session.commit()
+
+    report = replay_history(session)
+    assert report.mismatched == 2
+    assert report.verified == ROUNDS - 2
+    assert {(mismatch.session_id, mismatch.field) for mismatch in report.mismatches} == {
+        (first.id, "payout"), (second.id, "outcome"),
+    }
+    assert report.recorded_net == pytest.approx(report.replayed_net + 5)
@@ -0,0 +1,33 @@
+# the NumPy engine resolves dealt shoes exactly like simulator.play_round
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from cards import CARD_VALUES
+from rules import HOUSE_RULES
+from shoe import new_shoe
+from simulator import STRATEGIES, play_round
+from vector_sim import evaluate_shoes, hit_table
+
+ROUNDS = 2000
+
+
+@pytest.mark.parametrize("num_decks", [1, 2, 6, 8])
+@pytest.mark.parametrize("strategy_name", sorted(STRATEGIES))
+def test_evaluate_shoes_reproduces_play_round(strategy_name, num_decks):
+    strategy = STRATEGIES[strategy_name]
+    rules = HOUSE_RULES._replace(num_decks=num_decks)
+    rng = random.Random(num_decks)
+    shoes = []
+    for _ in range(ROUNDS):
+        cards = new_shoe(num_decks)
+        rng.shuffle(cards)
+        shoes.append([CARD_VALUES[card] for card in cards])
+    shoe_values = np.array(shoes)
+
+    payouts = evaluate_shoes(shoe_values, hit_table(strategy), rules)
+
+    expected = [play_round(iter(shoe).__next__, strategy, rules)[0] for shoe in shoes]
+    assert payouts.tolist() == expected